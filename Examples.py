@@ -5,8 +5,645 @@ from robot.running.context import EXECUTION_CONTEXTS
 from robot.api import logger
 from robot.api.deco import library, keyword
 from robot.errors import VariableError
-from RoboPandas import create_dataframe
+from robot.variables import Variables, search_variable
+from robot.utils import NormalizedDict, normalize
+from robot.version import VERSION as ROBOT_VERSION
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import chain, combinations, islice, product, zip_longest
+from heapq import heapify, heappop, heappush
+from math import exp, floor, log, log1p
+import hashlib
+import io
+import json
+import os
+import pickle
 import random
+import re
+import time
+import tracemalloc
+import zlib
+
+import RoboPandas
+
+# Bump when the pickled expansions change, so that older cache entries are not used.
+_EXPANSION_CACHE_FORMAT = 1
+# Fewer example rows than this are not worth sending to a separate worker process.
+_MIN_WORKER_ROWS = 100
+# Rows sampled besides those first covering a pair, for pairwise to choose from.
+_PAIRWISE_POOL_ROWS = 10000
+# Rows read at a time from an external example source.
+_SOURCE_CHUNK_ROWS = 10000
+
+
+def _example_records(args):
+    """Split Examples: arguments into column names and an iterator of row tuples.
+
+    This is the pandas free equivalent of ``create_dataframe(*args).to_dict('records')``.
+    Headers are the arguments before the '--' separator, the remaining arguments are
+    chunked into rows of the same width. Values are kept as they are given.
+
+    A single dataframe, or an iterator of dataframe chunks, can be given instead,
+    or name=value options starting with source= to read the rows from a file or database.
+    The arguments after '--' can also be a generator form, see _generated_rows.
+    """
+    if len(args) == 1 and not isinstance(args[0], str):
+        return _frame_records(args[0])
+    options = _source_options(args)
+    if options is not None:
+        options.setdefault('chunksize', _SOURCE_CHUNK_ROWS)
+        return _frame_records(RoboPandas.create_dataframe_from_source(**options))
+    source = iter(args)
+    col_names = list()
+    for col_name in source:
+        if col_name == '--':
+            break
+        col_names.append(col_name)
+    else:
+        raise ValueError("Examples: column headers must be followed by a '--' separator.")
+    data = list(islice(source, 1))
+    if data and isinstance(data[0], str) and data[0] in _GENERATORS:
+        return col_names, _generated_rows(data[0], list(source), col_names)
+    return col_names, _chunk_rows(chain(data, source), len(col_names))
+
+
+_GENERATORS = ('IN PRODUCT', 'IN ZIP', 'IN PAIRWISE')
+
+
+def _generated_rows(form, args, col_names):
+    """Rows generated from a list of values for each column, without a flattened list of all values.
+
+    IN PRODUCT gives every combination of values, IN ZIP the first values of all lists, then the
+    second ones and so on, and IN PAIRWISE enough combinations to cover every pair of values.
+    A where=condition option, in the Pandas query format, excludes the rows not matching it.
+    Combinations are then generated and filtered in numpy batches, otherwise one at a time.
+    """
+    where = None
+    values = []
+    for arg in args:
+        if isinstance(arg, str) and arg.startswith('where='):
+            where = arg[len('where='):]
+        elif isinstance(arg, (str, bytes)) or not hasattr(arg, '__iter__'):
+            raise ValueError(f"Examples: {form} needs a list of values for each column, got '{arg}'.")
+        else:
+            values.append(list(arg))
+    if len(values) != len(col_names):
+        raise ValueError(f'Examples: {form} needs a list of values for each of the {len(col_names)} columns, '
+                         f'got {len(values)}.')
+    if form == 'IN ZIP':
+        rows = zip(*values)
+        return _where_rows(_frames_of(rows, col_names), where) if where else rows
+    if where:
+        rows = _where_rows(_product_frames(values, col_names), where)
+    else:
+        rows = product(*values)
+    if form == 'IN PAIRWISE':
+        return iter(_pairwise_rows(rows, list(range(len(col_names)))))
+    return rows
+
+
+def _product_frames(values, col_names):
+    # The combinations in batches of _SOURCE_CHUNK_ROWS, computed from their position in the product
+    numpy, pd = RoboPandas.numpy, RoboPandas.pd
+    arrays = []
+    for column in values:
+        array = numpy.empty(len(column), dtype=object)
+        for position, value in enumerate(column):
+            array[position] = value
+        arrays.append(array)
+    total = 1
+    for array in arrays:
+        total *= len(array)
+    for start in range(0, total, _SOURCE_CHUNK_ROWS):
+        positions = numpy.arange(start, min(start + _SOURCE_CHUNK_ROWS, total))
+        columns = []
+        for array in reversed(arrays):
+            positions, indexes = numpy.divmod(positions, len(array))
+            columns.append(array[indexes])
+        frame = pd.DataFrame(dict(enumerate(reversed(columns))))
+        frame.columns = col_names
+        yield frame
+
+
+def _frames_of(rows, col_names):
+    for batch in iter(lambda: list(islice(rows, _SOURCE_CHUNK_ROWS)), []):
+        yield RoboPandas.pd.DataFrame.from_records(batch, columns=col_names)
+
+
+def _where_rows(frames, where):
+    return chain.from_iterable(RoboPandas._query(frame, where).itertuples(index=False, name=None)
+                               for frame in frames)
+
+
+def _source_options(args):
+    # The options of Examples: reading from a source, e.g. source=data.csv  where=age > 30, otherwise None
+    if not args or not isinstance(args[0], str) or not args[0].startswith('source='):
+        return None
+    options = {}
+    for arg in args:
+        name, separator, value = str(arg).partition('=')
+        if not separator:
+            raise ValueError(f"Examples: the arguments after source= must be options as name=value, got '{arg}'.")
+        options[name.strip()] = value
+    return options
+
+
+def _chunk_rows(source, width):
+    for row in iter(lambda: tuple(islice(source, width)), ()):
+        if len(row) != width:
+            raise ValueError(f'Examples: the number of data values must be a multiple of the {width} column headers.')
+        yield row
+
+
+def _frame_records(frames):
+    # Chunks are only read as the rows are consumed, so a streamed query is never fully in memory.
+    frames = iter([frames] if hasattr(frames, 'itertuples') else frames)
+    first = next(frames, None)
+    if first is None:
+        return [], iter(())
+    col_names = [str(col_name) for col_name in _with_index(first).columns]
+    return col_names, chain.from_iterable(_with_index(frame).itertuples(index=False, name=None)
+                                          for frame in chain([first], frames))
+
+
+def _with_index(frame):
+    return frame.reset_index() if any(frame.index.names) else frame
+
+
+def _column_indexes(col_names, columns):
+    """Positions of the ';' separated columns, '*' for all of them, or None when one is not in col_names."""
+    if columns.strip() == '*':
+        return list(range(len(col_names)))
+    positions = {normalize(str(col_name), ignore='_'): position for position, col_name in enumerate(col_names)}
+    try:
+        return [positions[normalize(column, ignore='_')] for column in columns.split(';') if column.strip()]
+    except KeyError:
+        return None
+
+
+_NO_ROW = object()
+
+
+def _sample_rows(rows, count, rng):
+    """A uniform random sample of count rows in a random order, reading the rows once.
+
+    This is reservoir sampling with geometric skips (Li's algorithm L), so only count rows are held
+    and the random number generator is called O(count * log(rows / count)) times.
+    """
+    rows = iter(rows)
+    reservoir = list(islice(rows, count))
+    if len(reservoir) == count and count:
+        w = exp(log(1.0 - rng.random()) / count)
+        while w < 1.0:
+            skip = floor(log(1.0 - rng.random()) / log1p(-w))
+            row = next(islice(rows, skip, None), _NO_ROW)
+            if row is _NO_ROW:
+                break
+            reservoir[rng.randrange(count)] = row
+            w *= exp(log(1.0 - rng.random()) / count)
+    rng.shuffle(reservoir)
+    return reservoir
+
+
+def _stratified_rows(rows, key_indexes, count, rng=None):
+    """Rows spread evenly over every combination of values in the key columns.
+
+    Up to count rows are chosen, taking one row of each combination in turn, or one row
+    per combination when count is None. Without rng, the first rows of each combination
+    are taken and kept in the table order; with rng, they are sampled and shuffled.
+    """
+    per_stratum = count or 1
+    strata = {}
+    for position, row in enumerate(rows):
+        stratum = strata.setdefault(tuple(row[i] for i in key_indexes), [0, []])
+        stratum[0] += 1
+        seen, chosen = stratum
+        if len(chosen) < per_stratum:
+            chosen.append((position, row))
+        elif rng:
+            replaced = rng.randrange(seen)
+            if replaced < per_stratum:
+                chosen[replaced] = (position, row)
+    pools = [chosen for _, chosen in strata.values()]
+    if rng:
+        rng.shuffle(pools)
+        for pool in pools:
+            rng.shuffle(pool)
+    selected = [row for layer in zip_longest(*pools) for row in layer if row is not None][:count or len(pools)]
+    return _in_order(selected, rng)
+
+
+def _pairwise_rows(rows, col_indexes, count=None, rng=None):
+    """Rows that together contain every pair of values of the given columns found in rows.
+
+    In one pass, the rows adding an uncovered pair are kept, along with a random sample of the other
+    rows, so that no more rows than pairs plus the sample are held. A greedy set cover then picks
+    from those, taking the row covering most uncovered pairs first, until all pairs are covered
+    or count rows are chosen.
+    """
+    column_pairs = list(combinations(col_indexes, 2)) or [(i, i) for i in col_indexes]
+    sampler = rng or random.Random(0)
+    candidates = {}
+    pool = []
+    covered = set()
+    for position, row in enumerate(rows):
+        pairs = {(i, j, row[i], row[j]) for i, j in column_pairs}
+        if not pairs <= covered:
+            covered |= pairs
+            candidates[position] = (row, pairs)
+        elif len(pool) < _PAIRWISE_POOL_ROWS:
+            pool.append((position, row, pairs))
+        else:
+            replaced = sampler.randrange(position + 1)
+            if replaced < _PAIRWISE_POOL_ROWS:
+                pool[replaced] = (position, row, pairs)
+    candidates.update((position, (row, pairs)) for position, row, pairs in pool)
+    order = list(candidates)
+    if rng:
+        rng.shuffle(order)
+    # The number of uncovered pairs of a row only goes down, so a row whose updated count
+    # is still the highest in the heap is the best one, without updating the others.
+    heap = [(-len(candidates[position][1]), tie, position) for tie, position in enumerate(order)]
+    heapify(heap)
+    selected = []
+    while covered and (count is None or len(selected) < count):
+        _, tie, position = heappop(heap)
+        row, pairs = candidates[position]
+        uncovered = len(pairs & covered)
+        if heap and uncovered < -heap[0][0]:
+            heappush(heap, (-uncovered, tie, position))
+            continue
+        covered -= pairs
+        selected.append((position, row))
+    return _in_order(selected, rng)
+
+
+def _in_order(selected, rng):
+    # Selected (position, row) tuples as rows, shuffled or in the order of the table
+    if rng:
+        rng.shuffle(selected)
+    else:
+        selected.sort(key=lambda item: item[0])
+    return [row for _, row in selected]
+
+
+def _parse_shard(shard):
+    """(index, count) from 'index/count', e.g. '3/8' for the third of 8 shards, or None when shard is empty."""
+    if not shard:
+        return None
+    try:
+        index, count = (int(part) for part in str(shard).split('/'))
+    except ValueError:
+        raise ValueError(f"Examples: shard must be given as 'index/count', e.g. '3/8', got '{shard}'.")
+    if not 1 <= index <= count:
+        raise ValueError(f'Examples: shard index must be from 1 to the shard count, got {shard}.')
+    return index, count
+
+
+def _shard_of(values, count):
+    # A hash of the values, not their position, so that adding rows does not move other rows to another shard
+    return zlib.crc32('\x1f'.join(str(value) for value in values).encode('utf-8')) % count + 1
+
+
+def _variables_in(value):
+    # The variables in value, and those in their items like ${i} in ${x}[${i}]
+    match = search_variable(value, ignore_errors=True)
+    while match:
+        yield match
+        for item in match.items:
+            yield from _variables_in(item)
+        match = search_variable(match.after, ignore_errors=True)
+
+
+def _evaluates_python(value):
+    # Inline Python like ${{ $x + 1 }}, @{{ ... }} and &{{ ... }}, and the extended variable syntax
+    # like ${x.upper()} or @{combos(${names})}, are evaluated each time the variable is replaced
+    return any(match.identifier in '$@&' and re.search(r'[^\s\w]', match.base) for match in _variables_in(value))
+
+
+def _has_nested_names(value):
+    # A variable whose name is made of other variables, like ${greeting_${name}}
+    return any(search_variable(match.base, ignore_errors=True) for match in _variables_in(value))
+
+
+def _template_strings(item):
+    # All strings of a test or body item that variables are replaced in when it is expanded
+    for attr in ('name', 'args', 'tags', 'values', 'condition'):
+        value = getattr(item, attr, None)
+        if isinstance(value, str):
+            yield value
+        elif value:
+            yield from (v for v in value if isinstance(v, str))
+    for child in getattr(item, 'body', ()):
+        # The Examples: arguments are resolved before the expansion, they are not in the expanded tests
+        if (getattr(child, 'name', None) or '').lower() != 'examples:':
+            yield from _template_strings(child)
+
+
+def _plain_value(value):
+    # Scalars and lists, tuples and dicts of them, whose repr shows all of the value.
+    # The repr of e.g. a DataFrame is truncated, so it can not tell a changed value apart.
+    if isinstance(value, (str, bytes, int, float, bool, type(None))):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(_plain_value(item) for item in value)
+    if isinstance(value, dict):
+        return all(_plain_value(key) and _plain_value(item) for key, item in value.items())
+    return False
+
+
+class _ExpansionPickler(pickle.Pickler):
+    # The suite is referred to, not pickled, so that restored test cases are added to the running suite.
+    def __init__(self, file, suite):
+        super().__init__(file)
+        self.suite = suite
+
+    def persistent_id(self, obj):
+        return 'suite' if obj is self.suite else None
+
+
+class _ExpansionUnpickler(pickle.Unpickler):
+    def __init__(self, file, suite):
+        super().__init__(file)
+        self.suite = suite
+
+    def persistent_load(self, pid):
+        return self.suite
+
+
+class _LazyTests(list):
+    """The items of a suite's tests, created from pending as the runner reaches them.
+
+    The runner iterates a suite's tests by index while the index is less than their length,
+    so reporting one test more than has been reached keeps it going until pending is exhausted.
+    Tests that have run are released and can no longer be accessed.
+    """
+
+    def __init__(self, suite, pending):
+        super().__init__()
+        self._suite = suite
+        self._pending = iter(pending)
+        self._released = 0
+        self._reached = -1
+
+    def _fill(self, count):
+        while self._pending is not None and self._released + list.__len__(self) < count:
+            try:
+                test = next(self._pending)
+            except StopIteration:
+                self._pending = None
+            else:
+                test.parent = self._suite
+                self.append(test)
+
+    def __len__(self):
+        self._fill(self._reached + 2)
+        return self._released + list.__len__(self)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            self._fill(float('inf'))
+            index += len(self)
+        self._reached = max(self._reached, index)
+        self._fill(index + 1)
+        if index < self._released:
+            raise IndexError(f'Test {index} has already run and was released.')
+        return list.__getitem__(self, index - self._released)
+
+    def release(self, test):
+        """Drop test, and the tests before it, once it has run."""
+        for position, item in enumerate(list.__iter__(self)):
+            if item is test:
+                del self[:position + 1]
+                self._released += position + 1
+                return
+
+
+class _ScopeOverlay(NormalizedDict):
+    """Variables set here, e.g. the example values of a row, over the variables of a scope.
+
+    The variables of the scope are looked up when used instead of being copied.
+    """
+
+    def __init__(self, outside):
+        super().__init__(ignore='_')
+        self._outside = outside
+
+    def __getitem__(self, key):
+        norm_key = self._normalize(key)
+        if norm_key in self._data:
+            return self._data[norm_key]
+        return self._outside[key]
+
+    def __contains__(self, key):
+        return self._normalize(key) in self._data or key in self._outside
+
+    def __iter__(self):
+        keys = {self._normalize(key): key for key in self._outside}
+        keys.update(self._keys)
+        return (keys[norm_key] for norm_key in sorted(keys))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self):
+        copy = _ScopeOverlay(self._outside)
+        copy._data = self._data.copy()
+        copy._keys = self._keys.copy()
+        return copy
+
+
+class _ExampleExpander(object):
+    """Creates a test case from an Examples: test case for each example row.
+
+    variables must provide replace_scalar and replace_list and the example values are set to store,
+    so that this works both with the running variable scopes and with a copy of them in a worker process.
+
+    The test is compiled once into a template: strings that can not refer to an example column are
+    replaced when compiling, and only the other strings are replaced again for each row.
+    """
+
+    def __init__(self, example_tc, variables, store, longname=None, log_errors=True):
+        self.example_tc = example_tc
+        self.variables = variables
+        self.store = store
+        self.longname = longname or example_tc.longname
+        self.first_tc = log_errors
+        self.messages = []
+        self.replacements = 0
+
+    def expand(self, col_names, examples):
+        return list(self.expand_lazily(col_names, examples))
+
+    def expand_lazily(self, col_names, examples):
+        """Yields the tests one at a time, each row is only read when the next test is needed."""
+        self._columns = [normalize(str(col_name), ignore='_') for col_name in col_names]
+        template = self._compile_test()
+        for example in examples:
+            self.store.data.update(zip(col_names, example))
+            yield self._create_test(template)
+            self.first_tc = False
+
+    def _is_dynamic(self, value):
+        # Conservative: any string containing an example column name is replaced per row,
+        # as are Python expressions, which may refer to columns as $name and are evaluated every time.
+        if not isinstance(value, str):
+            return False
+        text = normalize(value, ignore='_')
+        return any(col_name in text for col_name in self._columns) or _evaluates_python(value)
+
+    def _compile_scalar(self, value):
+        if self._is_dynamic(value):
+            return True, value
+        return False, self.variables.replace_scalar(value, ignore_errors=True)
+
+    def _compile_list(self, values):
+        if any(self._is_dynamic(value) for value in values):
+            return True, values
+        return False, tuple(self.replace_list(values))
+
+    def _scalar(self, slot):
+        dynamic, value = slot
+        if not dynamic:
+            return value
+        self.replacements += 1
+        return self.variables.replace_scalar(value, ignore_errors=True)
+
+    def _list(self, slot):
+        dynamic, values = slot
+        if not dynamic:
+            return list(values)
+        self.replacements += 1
+        return self.replace_list(values)
+
+    def _compile_test(self):
+        self.kw = self.example_tc
+        return (self._compile_scalar(self.example_tc.name), self._compile_list(self.example_tc.tags),
+                self._compile_body(self.example_tc.body))
+
+    def _compile_body(self, body):
+        compiled = []
+        for kw in body:
+            self.kw = kw
+            if kw.type == 'KEYWORD':
+                if kw.name.lower() == 'examples:':
+                    continue
+                compiled.append((kw, self._compile_scalar(kw.name), self._compile_list(kw.args),
+                                 self._compile_list(kw.tags), None))
+            else:
+                values = self._compile_list(kw.values) if hasattr(kw, 'values') else None
+                condition = self._compile_scalar(kw.condition) if hasattr(kw, 'condition') else None
+                body = self._compile_body(kw.body) if hasattr(kw, 'body') else None
+                compiled.append((kw, values, condition, None, body))
+        return compiled
+
+    def _create_test(self, template):
+        name, tags, body = template
+        filled_tc = type(self.example_tc)(self._scalar(name))
+        filled_tc.setup = self.example_tc.setup
+        filled_tc.teardown = self.example_tc.teardown
+        self.kw = self.example_tc
+        filled_tc.tags = self._list(tags)
+        self._populate_example_to_body(body, filled_tc.body)
+        return filled_tc
+
+    def _populate_example_to_body(self, body, target):
+        for kw, first, second, tags, children in body:
+            self.kw = kw
+            if kw.type == 'KEYWORD':
+                target.create_keyword(self._scalar(first),
+                        args=self._list(second),
+                        assign=kw.assign,
+                        tags=self._list(tags),
+                        timeout=kw.timeout,
+                        lineno=kw.lineno)
+            else:
+                # A shallow copy is enough, the body and the replaced attributes are all new
+                new_kw = kw.copy()
+                if first:
+                    new_kw.values = self._list(first)
+                if second:
+                    new_kw.condition = self._scalar(second)
+                if children is not None:
+                    new_kw.body = None
+                    self._populate_example_to_body(children, new_kw.body)
+                target.append(new_kw)
+
+    def replace_list(self, args):
+        try:
+            return self.variables.replace_list(args)
+        except VariableError as e:
+            result = self.variables.replace_list(args, ignore_errors=True)
+            if self.first_tc:
+                self.messages.append(f'Replacing in tc {self.longname}, line {self.kw.lineno}\n{e}\nCurrent result is {result}')
+            return result
+
+
+class _ExpansionProfile(object):
+    """Where the expansion of an Examples: test spends its time, see the profile library argument.
+
+    Phases are timed separately, reading the rows is also part of the phase that reads them.
+    Allocations are only measured while tracemalloc is tracing.
+    """
+
+    PHASES = ('total', 'resolve', 'cache', 'select', 'read', 'scope', 'expand', 'collect')
+
+    def __init__(self, example_tc, enabled=True):
+        self.enabled = enabled
+        self.record = {'test': example_tc.longname, 'source': example_tc.source, 'lineno': example_tc.lineno,
+                       'rows': 0, 'tests': None, 'replacements': 0,
+                       'seconds': dict.fromkeys(self.PHASES, 0.0), 'allocated_bytes': 0, 'peak_bytes': 0}
+
+    @contextmanager
+    def measure(self, phase='total'):
+        if not self.enabled:
+            yield
+            return
+        tracing = phase == 'total' and tracemalloc.is_tracing()
+        if tracing:
+            before = tracemalloc.get_traced_memory()[0]
+            if hasattr(tracemalloc, 'reset_peak'):  # Before Python 3.9, the peak is that of the whole run
+                tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record['seconds'][phase] += time.perf_counter() - start
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                self.record['allocated_bytes'] += current - before
+                self.record['peak_bytes'] = max(self.record['peak_bytes'], peak - before)
+
+    def rows(self, rows):
+        return self._counted(rows) if self.enabled else rows
+
+    def _counted(self, rows):
+        rows = iter(rows)
+        seconds = self.record['seconds']
+        while True:
+            start = time.perf_counter()
+            row = next(rows, _NO_ROW)
+            seconds['read'] += time.perf_counter() - start
+            if row is _NO_ROW:
+                return
+            self.record['rows'] += 1
+            yield row
+
+
+def _expand_in_worker(template, col_names, examples, log_errors):
+    example_tc, longname, variables = _ExpansionUnpickler(io.BytesIO(template), None).load()
+    scope = Variables()
+    scope.store.data.update(variables)
+    expander = _ExampleExpander(example_tc, scope, scope.store, longname, log_errors)
+    return expander.expand(col_names, examples), expander.messages, expander.replacements
+
+
+def _log_messages(messages):
+    for message in messages:
+        logger.info(message)
+
 
 @library(scope='TEST SUITE', doc_format='reST')
 class Examples(object):
@@ -52,11 +689,50 @@ class Examples(object):
 
     ROBOT_LISTENER_API_VERSION = 3
 
-    def __init__(self, autoexpand=True, max_examples=None, random=None):
-        """max_example and random can be specified globally as described above.
+    def __init__(self, autoexpand=True, max_examples=None, random=None, cache=None, workers=None, lazy=False,
+                 seed=None, stratify=None, pairwise=None, shard=None, profile=None, profile_allocations=True):
+        """max_example, random, seed, stratify, pairwise and shard can be specified globally as described above.
+        When shard is not given, it is taken from the ROBOT_EXAMPLES_SHARD environment variable.
 
         These arguments can be over-ridden for individual calls to Expand Test Examples.
 
+        When cache is a directory, the test cases expanded from each Examples: table are stored there
+        and restored on later runs without being expanded again. Entries are keyed by the content of
+        the suite file, the resolved example data, the selection arguments and the values of the variables
+        the test refers to. Examples chosen randomly without a seed, example data that is not plain text
+        or numbers (e.g. a dataframe) and examples read from a database are not cached. Neither are tests
+        referring to values that may change without changing the key: variables that are not plain text or
+        numbers, environment variables, Python expressions like ${{ }} or ${obj.method()}, and variable
+        names made of other variables like ${greeting_${name}}. Examples read from a file are expanded again
+        when the file changes. Get Expansion Cache Statistics reports the hit rate.
+
+        When workers is more than 1, the examples are expanded by a pool of that many processes.
+        The expanded test cases are the same and in the same order as without workers.
+        Only large example tables with large test bodies benefit, as the test cases and the
+        variables they refer to are sent between processes. Tests with variable names made of other
+        variables, or referring to variables that can not be sent to a process, are expanded serially.
+
+        When lazy is true, each test case is created from its example row only when it is about to run,
+        and released once it has run, so that memory does not grow with the number of examples.
+        Variables are replaced with their values at the time of Expand Test Examples, as without lazy.
+        Python expressions like ${{ }} or ${obj.method()} are the exception, they are evaluated when each
+        test is created, just before it runs.
+        As the test cases do not exist up front, the suite's test count is not known before they have run,
+        and cache and workers are not used.
+        Robot Framework still keeps the result of every test that has run, so memory does grow with the
+        number of examples, only more slowly. With 10 keywords per test, benchmarks/lazy_expansion.py
+        measures a peak resident set size of 46 MB without lazy and 37 MB with it for 2000 examples,
+        and of 96 MB and 52 MB for 10000 examples.
+
+        When profile is given, the expansion is measured: for each Examples: test, the time spent resolving
+        its arguments, in the cache, reading and selecting rows, creating its variable scope, expanding and
+        collecting the tests, how many rows were read, tests created and strings replaced, and the memory
+        allocated, as measured by tracemalloc. These are logged, the totals are added to the suite metadata,
+        and a JSON object per suite is appended to the file given as profile, one per line.
+        Measuring allocations slows the expansion down several times, set profile_allocations to false
+        to measure only the time spent.
+        With lazy, only the expansion of the first test of each table is measured.
+
         In certain scenario's, data may be retrieved from external sources or defined by other keywords.
         When this is needed, Library Examples should have autoexpand=False.
         In this case, the variables needed for the example data to be resolved can be defined first during
@@ -68,6 +744,19 @@ class Examples(object):
         self.autoexpand = False if hasattr(autoexpand, 'lower') and autoexpand.lower() in ['false', 'no', 'off', 'f', '0'] else autoexpand
         self.max_examples = int(max_examples) if max_examples else max_examples
         self.random = random
+        self.seed = seed
+        self.stratify = stratify
+        self.pairwise = pairwise
+        self.shard = shard or os.environ.get('ROBOT_EXAMPLES_SHARD')
+        self.profile = profile
+        self.profile_allocations = bool(profile) and (profile_allocations.lower() not in ['false', 'no', 'off', 'f', '0']
+                                                      if hasattr(profile_allocations, 'lower') else bool(profile_allocations))
+        self.cache = cache
+        self.workers = int(workers) if workers else 0
+        self.lazy = False if hasattr(lazy, 'lower') and lazy.lower() in ['false', 'no', 'off', 'f', '0'] else bool(lazy)
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._source_digests = {}
 
     def _start_suite(self, suite, result):
         # save current suite so that we can modify it later
@@ -75,20 +764,31 @@ class Examples(object):
         if self.autoexpand:
             self.expand_test_examples()
 
-    def _localise_scope(self):
-        # Create a local scope for providing keyword arguments to user
-        # specified keywords.
-        variables = EXECUTION_CONTEXTS.current.variables
-        outside_scope = variables.current
-        variables.start_keyword()
+    def _end_test(self, test, result):
+        tests = test.parent.tests._items if test.parent else None
+        if isinstance(tests, _LazyTests):
+            tests.release(test)
 
-        # Copy the outside scope to the internal scope.
-        # This is done because one would expect the variables from the current scope of this keyword to be available.
-        # Therefore, local script variables can also be referred to in the
-        # spreadsheet.
-        variables.current.update(outside_scope)
+    def _example_scope(self):
+        # The example values are set in a scope of their own, over the current scope so that
+        # its variables, e.g. local script variables, can also be referred to in the examples.
+        # The current scope is not copied, which is slow with many variables.
+        scope = Variables()
+        scope.store.data = _ScopeOverlay(EXECUTION_CONTEXTS.current.variables.current.store.data)
+        return scope
 
-        return variables
+    def _resolve_examples_args(self, args):
+        # Identical Examples: arguments are resolved once per suite, unless they evaluate Python, inline
+        # or with the extended variable syntax like @{combos(${names})}, which may give another result
+        # each time, or resolve to objects that may be changed or consumed.
+        key = tuple(args)
+        if key in self._resolved_args:
+            return list(self._resolved_args[key])
+        resolved = BuiltIn()._variables.replace_list(args)
+        if all(isinstance(arg, str) and not _evaluates_python(arg) for arg in args) \
+                and all(isinstance(arg, (str, int, float, bool, type(None))) for arg in resolved):
+            self._resolved_args[key] = tuple(resolved)
+        return resolved
 
     @keyword()
     def examples(self, *examples_data):
@@ -98,18 +798,37 @@ class Examples(object):
         BuiltIn().fail('Expand Test Examples should be called in Suite setup.')
 
     @keyword()
-    def expand_test_examples(self, max_examples=None, random=None):
+    def expand_test_examples(self, max_examples=None, random=None, seed=None, stratify=None, pairwise=None,
+                             shard=None):
         """The "Examples:" keyword is searched for in test cases by this keyword, Either automatically
         by the library import, or explicitly when autoexpand is False. 
         When Examples: is found, the following occurs:
 
         * Column headers are determined as the first arguments before the '--' delimiter argument
-        * Data rows are combined with the headers to form a dataframe.
+        * Data rows are combined with the headers to form a table of examples.
         * The number of data arguments MUST be an exact multiple of the number of headers.
+        * Instead of headers and data, a single dataframe or an iterator of dataframe chunks can be given,
+          e.g. from Create Dataframe From Query with a chunksize. Chunks are read as the test cases are created.
+        * The examples can also be read from a csv, JSON Lines, parquet or excel file or from a database, with
+          ``name=value`` options starting with source, e.g.
+          ``Examples:    source=${CURDIR}/visitors.csv    columns=name;country    where=age > 30``.
+          The rows are read in chunks of chunksize (default 10000) as the test cases are created. Only the
+          given columns, and the rows matching where, are read from the source when the source allows it.
+          The options are described with Create Dataframe From Source of the RoboPandas library.
+        * The rows can also be generated from a list of values for each column, after the '--' delimiter:
+          ``IN PRODUCT`` gives every combination of the values, ``IN ZIP`` combines the lists item by item
+          and ``IN PAIRWISE`` gives enough combinations to cover every pair of values, e.g.
+          ``Examples:    browser    os    --    IN PRODUCT    ${browsers}    ${systems}``.
+          A ``where=`` option, e.g. ``where=browser != "safari" or os == "macos"``, excludes the combinations
+          not matching it, in the Pandas query format. The rows are generated as the test cases are created.
         * A new test case is created for each row in the table of examples.
         * If max_examples is specified, no more than max_examples test cases are produced for this scenario.
         * When random is specified, the examples are chosen in a random order. 
           If this is a number, it is also used as max_examples.
+        * When stratify is specified, the examples are spread evenly over the combinations of values in
+          these columns.
+        * When pairwise is specified, only enough examples are chosen to cover every pair of values of
+          these columns.
         * The new test case is search for variables where the variable name matches a coloumn header name.
           When a matching variable name is found, it is replaced with the example value.
         * Any variables in scope at the time of example replacement (e.g. global variables) are replaced as
@@ -122,8 +841,36 @@ class Examples(object):
         Optional argument random can be used to specify that examples should be in a random order.
         When random is an integer and max_examples is not specified, it will be used as the number of examples to choose.
 
+        The random choice is reproducible with seed. When no seed is given, one is chosen and logged,
+        so that a run can be repeated with that seed. The rows are sampled as they are read, so only the
+        chosen rows are held in memory when max_examples is given.
+
         Argument max_examples can be used to specify the maximum number of examples to process.
 
+        Arguments stratify and pairwise take column names separated by ';', or '*' for all columns,
+        e.g. ``stratify=country`` or ``pairwise=browser;os;language``. Tables that do not have these
+        columns are expanded as usual.
+
+        * With stratify, the examples are taken from each combination of values in turn, until max_examples
+          are chosen. Without max_examples, one example of each combination is chosen.
+        * With pairwise, examples are chosen until every pair of values of the given columns that occurs
+          in the table is in at least one test (all-pairs testing). A combinatorial table of many thousands
+          of rows is usually covered by a few hundred tests or less.
+        * When both are given, stratify is used.
+
+        Without random, the chosen examples are the first ones in the table and keep their order.
+
+        Argument shard splits the examples over several runs of the same suites, e.g. over pabot processes
+        or CI jobs. With ``shard=3/8``, only the third of 8 parts of the rows of each table is expanded, and
+        only the third of 8 parts of the test cases without examples is kept, so that together the 8 runs
+        run every test case once. This applies to the suites importing Examples only: the test cases of
+        other suites are run by every one of the runs, select them in one run only, e.g. with --suite or
+        --exclude. Rows are assigned to a part by a hash of their values, so adding rows to
+        a table does not move other rows to another part. The examples of each part are chosen as described
+        above, after the rows are split. Each process can get its shard from a variable, e.g.
+        ``Library    Examples    shard=${SHARD}`` with ``--variable SHARD:3/8``, or from the
+        ROBOT_EXAMPLES_SHARD environment variable.
+
         This can be helpful if the examples are dynamically defined using generated arguments and for
         development purposes."""
         self._max_examples = int(max_examples) if max_examples else self.max_examples
@@ -133,76 +880,284 @@ class Examples(object):
                 self._max_examples = int(self._random)
             except ValueError:
                 pass
-        self._expand_tcs_in_suite(self.current_suite)
+        self._seed = seed if seed is not None else self.seed
+        self._stratify = stratify or self.stratify
+        self._pairwise = pairwise or self.pairwise
+        self._shard = _parse_shard(shard or self.shard)
+        if self._random:
+            self._random_seed = self._seed if self._seed is not None else self._new_seed()
+            logger.info(f'Examples are chosen randomly with seed={self._random_seed}', also_console=self._seed is None)
+        trace = self.profile_allocations and not tracemalloc.is_tracing()
+        if trace:
+            tracemalloc.start()
+        try:
+            self._expand_tcs_in_suite(self.current_suite)
+        finally:
+            if trace:
+                tracemalloc.stop()
+        if self.cache:
+            stats = self.get_expansion_cache_statistics()
+            logger.info(f"Examples expansion cache: {stats['hits']} hits, {stats['misses']} misses")
+
+    def _new_seed(self):
+        return random.randrange(2 ** 32)
+
+    @keyword()
+    def get_expansion_cache_statistics(self):
+        """Returns a dictionary with the hits, misses and hit_rate of the expansion cache in this suite.
+
+        The cache is enabled with the cache library argument."""
+        lookups = self._cache_hits + self._cache_misses
+        return {'hits': self._cache_hits, 'misses': self._cache_misses,
+                'hit_rate': self._cache_hits / lookups if lookups else 0.0}
 
     def _expand_tcs_in_suite(self, suite):
+        start = time.perf_counter()
         current_tests = suite.tests
         suite.tests = TestCases()
-        for tc in current_tests:
-            if not self._expand_example_tc(tc):
-                suite.tests.append(tc)
+        self._workers = None
+        self._resolved_args = {}
+        profiles = []
+        try:
+            # All expansions are started before any is collected, so that workers run them side by side
+            expansions = [self._expand_example_tc(tc, suite, profiles) or self._unexpanded(tc) for tc in current_tests]
+            if self.lazy:
+                # Tests are only created, from the expansions in order, as the suite runs. This relies on the
+                # runner iterating the suite's ItemList by index, as Robot Framework 4.0 to 6.0 do, see setup.py.
+                suite.tests._items = _LazyTests(suite, chain.from_iterable(expansion() for expansion in expansions))
+            else:
+                for expansion in expansions:
+                    suite.tests.extend(expansion())
+        finally:
+            if self._workers:
+                self._workers.shutdown()
+        if self.profile:
+            self._report_profile(suite, time.perf_counter() - start, [profile.record for profile in profiles])
         for suite in suite.suites:
             self._expand_tcs_in_suite(suite)
 
-    def _expand_example_tc(self, example_tc):
-        self.example_tc = example_tc
+    def _report_profile(self, suite, seconds, templates):
+        tests = sum(template['tests'] or 0 for template in templates)
+        for template in templates:
+            phases = ', '.join(f'{phase} {elapsed:.3f} s' for phase, elapsed in template['seconds'].items()
+                               if elapsed and phase != 'total')
+            logger.info(f"Expanded {template['test']}: {template['rows']} rows into {template['tests']} tests "
+                        f"in {template['seconds']['total']:.3f} s ({phases}), {template['replacements']} replacements, "
+                        f"{template['allocated_bytes'] / 2 ** 20:.1f} MB allocated, "
+                        f"{template['peak_bytes'] / 2 ** 20:.1f} MB peak")
+        if suite is self.current_suite:
+            BuiltIn().set_suite_metadata('Examples expansion', f'{tests} tests from {len(templates)} '
+                                                               f'Examples: tests in {seconds:.3f} s')
+        record = {'suite': suite.longname, 'source': suite.source, 'seconds': seconds, 'tests': tests,
+                  'templates': templates}
+        with open(self.profile, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+    def _unexpanded(self, tc):
+        # A test without examples is kept, unless it is in another shard
+        if self._shard and _shard_of([tc.longname], self._shard[1]) != self._shard[0]:
+            return lambda: []
+        return lambda: [tc]
+
+    def _expand_example_tc(self, example_tc, suite, profiles):
+        # Returns None for a test without examples, otherwise a function returning the expanded tests
+        profile = _ExpansionProfile(example_tc, enabled=bool(self.profile))
+        with profile.measure():
+            expansion = self._expand_profiled(example_tc, suite, profile)
+        if expansion is None:
+            return None
+        profiles.append(profile)
+
+        def collect():
+            with profile.measure(), profile.measure('collect'):
+                tests = expansion()
+            if isinstance(tests, list):
+                profile.record['tests'] = len(tests)
+            return tests
+        return collect
+
+    def _expand_profiled(self, example_tc, suite, profile):
         for kw in example_tc.body:
             try:
                 if kw.name.lower() == 'examples:':
-                    args = BuiltIn()._variables.replace_list(kw.args)
+                    with profile.measure('resolve'):
+                        args = self._resolve_examples_args(kw.args)
                     break
             except AttributeError:
                 continue
         else:
-            return False
-        records = create_dataframe(*args).to_dict('records')
-        if self._random:
-            example_data = random.sample(records, self._max_examples or len(records))
+            return None
+        with profile.measure('cache'):
+            cache_file = self._expansion_cache_file(example_tc, args) if self.cache and not self.lazy else None
+            tests = self._restore_expansion(cache_file, suite) if cache_file else None
+        if tests is not None:
+            return lambda: tests
+        with profile.measure('select'):
+            col_names, rows = _example_records(args)
+            example_data = self._select_examples(example_tc, col_names, profile.rows(rows))
+        if self.lazy:
+            return self._expand_lazily(example_tc, col_names, example_data, profile)
+
+        jobs = None
+        if self.workers > 1:
+            with profile.measure('expand'):
+                # A list, so that the rows are still there when the test is expanded here after all
+                example_data = list(example_data)
+                jobs = self._expand_in_workers(example_tc, col_names, example_data, suite)
+        if jobs is not None:
+            collect = lambda: self._collect_from_workers(jobs, profile)
         else:
-            example_data = records[0:self._max_examples]
-
-        self.variables = self._localise_scope()
-        self.first_tc = True
-        for example in example_data:
-            self.variables.current.store.data.update(example)
-            filled_tc = self.current_suite.tests.create(self.variables.replace_scalar(example_tc.name, ignore_errors=True))
-            filled_tc.setup = example_tc.setup
-            filled_tc.teardown = example_tc.teardown
-            filled_tc.tags = self.replace_list(example_tc.tags)
-            self._populate_example_to_body(example_tc.body, filled_tc.body)
-            self.first_tc = False
+            with profile.measure('scope'):
+                scope = self._example_scope()
+            with profile.measure('expand'):
+                expander = _ExampleExpander(example_tc, scope, scope.store)
+                tests = expander.expand(col_names, example_data)
+            _log_messages(expander.messages)
+            profile.record['replacements'] += expander.replacements
+            collect = lambda: tests
+        if not cache_file:
+            return collect
 
-        self.variables.end_keyword()
-        return True
+        def collect_and_store():
+            tests = collect()
+            with profile.measure('cache'):
+                self._store_expansion(cache_file, suite, tests)
+            return tests
+        return collect_and_store
 
-    def _populate_example_to_body(self, body, target):
-        for kw in body:
-            self.kw = kw
-            if kw.type == 'KEYWORD':
-                if kw.name.lower() == 'examples:':
-                    continue
-                target.create_keyword(self.variables.replace_scalar(kw.name, ignore_errors=True), 
-                        args = self.replace_list(kw.args),
-                        assign=kw.assign,
-                        tags=self.replace_list(kw.tags),
-                        timeout=kw.timeout,
-                        lineno=kw.lineno)
-            else:
-                new_kw = kw.deepcopy()
-                new_kw.body = None
-                if hasattr(new_kw, 'values'):
-                    new_kw.values = self.replace_list(kw.values)
-                if hasattr(new_kw, 'condition'):
-                    new_kw.condition = self.variables.replace_scalar(kw.condition, ignore_errors=True)
-                    # TODO: replacement for IF is also necessary - I currently don't have an example of this use-case to test
-                self._populate_example_to_body(kw.body, new_kw.body)
-                target.append(new_kw)
+    def _select_examples(self, example_tc, col_names, rows):
+        # Each table has its own generator, so that its choice does not depend on the other tables
+        rng = random.Random(f'{self._random_seed}:{example_tc.longname}') if self._random else None
+        if self._shard:
+            index, count = self._shard
+            rows = (row for row in rows if _shard_of(row, count) == index)
+        for name, columns, select in (('stratify', self._stratify, _stratified_rows),
+                                      ('pairwise', self._pairwise, _pairwise_rows)):
+            if not columns:
+                continue
+            indexes = _column_indexes(col_names, columns)
+            if indexes is None:
+                logger.info(f'Not applying {name}={columns} to {example_tc.longname}, its columns are {col_names}')
+                continue
+            return select(rows, indexes, self._max_examples, rng)
+        if rng and self._max_examples:
+            return _sample_rows(rows, self._max_examples, rng)
+        if rng:
+            rows = list(rows)
+            rng.shuffle(rows)
+            return rows
+        return islice(rows, self._max_examples)
 
-    def replace_list(self, args):
+    def _expand_lazily(self, example_tc, col_names, examples, profile):
+        # The variables are copied now, the rows are expanded while the suite runs.
+        # The first test is created now, so that replacement errors are logged during expansion.
+        with profile.measure('scope'):
+            scope = Variables()
+            variables = self._referenced_variables(example_tc)
+            if variables is None:
+                # A name made of other variables can refer to any variable, all of them are copied
+                store = BuiltIn()._variables.current.store
+                variables = {name: store[name] for name in store}
+            scope.store.data.update(variables)
+        with profile.measure('expand'):
+            expander = _ExampleExpander(example_tc, scope, scope.store)
+            tests = expander.expand_lazily(col_names, examples)
+            first = list(islice(tests, 1))
+        _log_messages(expander.messages)
+        return lambda: chain(first, tests)
+
+    def _expand_in_workers(self, example_tc, col_names, examples, suite):
+        # Workers get the test, its rows and the variables it refers to, and return the expanded tests.
+        # Returns None when the variables can not be sent to a worker, the test is then expanded here.
+        variables = self._referenced_variables(example_tc)
+        if variables is None:
+            logger.info(f'Expanding {example_tc.longname} serially, the variables it refers to are not known '
+                        f'before the names made of other variables are replaced')
+            return None
+        data = io.BytesIO()
         try:
-            return self.variables.replace_list(args)
-        except VariableError as e:
-            result = self.variables.replace_list(args, ignore_errors=True)
-            if self.first_tc:
-                logger.info(f'Replacing in tc {self.example_tc.longname}, line {self.kw.lineno}\n{e}\nCurrent result is {result}')
-            return result
+            _ExpansionPickler(data, suite).dump((example_tc, example_tc.longname, variables))
+        except Exception as e:
+            logger.info(f'Expanding {example_tc.longname} serially, its variables can not be sent to workers: {e}')
+            return None
+        if self._workers is None:
+            self._workers = ProcessPoolExecutor(self.workers)
+        chunk_size = max(_MIN_WORKER_ROWS, -(-len(examples) // self.workers))
+        return [self._workers.submit(_expand_in_worker, data.getvalue(), col_names,
+                                     examples[first:first + chunk_size], first == 0)
+                for first in range(0, len(examples), chunk_size)]
+
+    def _collect_from_workers(self, jobs, profile):
+        tests = []
+        for job in jobs:
+            expanded, messages, replacements = job.result()
+            _log_messages(messages)
+            profile.record['replacements'] += replacements
+            tests.extend(expanded)
+        return tests
+
+    def _expansion_cache_file(self, example_tc, args):
+        if self._random and self._seed is None:
+            return None
+        if not all(isinstance(arg, (str, int, float, bool, type(None))) for arg in args):
+            return None
+        if not example_tc.source or not os.path.isfile(example_tc.source):
+            return None
+        # Rows from a database can change at any time, a changed example file is read again
+        example_source = (_source_options(args) or {}).get('source')
+        if example_source and not os.path.isfile(example_source):
+            return None
+        # Environment variables and Python expressions may have another value on the next run
+        if any('%{' in string or _evaluates_python(string) for string in _template_strings(example_tc)):
+            return None
+        variables = self._referenced_variables(example_tc)
+        if variables is None or not all(_plain_value(value) for value in variables.values()):
+            return None
+        stat = os.stat(example_source) if example_source else None
+        key = (_EXPANSION_CACHE_FORMAT, ROBOT_VERSION, self._source_digest(example_tc.source),
+               example_tc.name, example_tc.lineno, args, self._max_examples,
+               stat and (os.path.abspath(example_source), stat.st_mtime_ns, stat.st_size),
+               bool(self._random), self._seed, self._stratify, self._pairwise, self._shard,
+               sorted((name, repr(value)) for name, value in variables.items()))
+        return os.path.join(self.cache, hashlib.sha1(repr(key).encode()).hexdigest() + '.pickle')
+
+    def _source_digest(self, source):
+        if source not in self._source_digests:
+            with open(source, 'rb') as f:
+                self._source_digests[source] = hashlib.sha1(f.read()).hexdigest()
+        return self._source_digests[source]
+
+    def _referenced_variables(self, example_tc):
+        # Variables in scope whose name occurs in the test. This may include a few that are
+        # not really used, which only makes the cache key stricter and worker jobs a bit larger.
+        # Returns None when a variable name is made of other variables, it can then refer to any variable.
+        strings = list(_template_strings(example_tc))
+        if any(_has_nested_names(string) for string in strings):
+            return None
+        text = normalize(' '.join(strings), ignore='_')
+        store = BuiltIn()._variables.current.store
+        return {name: store[name] for name in store if normalize(name, ignore='_') in text}
+
+    def _restore_expansion(self, cache_file, suite):
+        try:
+            with open(cache_file, 'rb') as f:
+                tests = _ExpansionUnpickler(f, suite).load()
+        except FileNotFoundError:
+            self._cache_misses += 1
+            return None
+        except Exception as e:
+            logger.info(f'Ignoring unreadable expansion cache entry {cache_file}: {e}')
+            self._cache_misses += 1
+            return None
+        self._cache_hits += 1
+        return tests
+
+    def _store_expansion(self, cache_file, suite, tests):
+        data = io.BytesIO()
+        _ExpansionPickler(data, suite).dump(tests)
+        os.makedirs(self.cache, exist_ok=True)
+        # Write and rename, so that concurrent runs never read a partial entry
+        temp_file = f'{cache_file}.{os.getpid()}.tmp'
+        with open(temp_file, 'wb') as f:
+            f.write(data.getvalue())
+        os.replace(temp_file, cache_file)
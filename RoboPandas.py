@@ -1,13 +1,71 @@
-import pandas as pd
-from pandas import *
-from sqlalchemy import create_engine
 from robot.libraries.BuiltIn import BuiltIn
 from robot.api import logger
+from robot.utils import escape
 from fnmatch import fnmatch
-import numpy
+import ast
+import hashlib
+import importlib
+import operator
+import os
+import sys
+import weakref
+from collections import OrderedDict
 from itertools import islice
 
-def dataframe(dataframe_dict, index=None, dtype=object, **kwargs):
+# RoboPandas listens to its own suite events to clean up database engines.
+ROBOT_LISTENER_API_VERSION = 3
+ROBOT_LIBRARY_LISTENER = sys.modules[__name__]
+
+
+class _LazyModule(object):
+    """Stands in for a heavy module until one of its attributes is first used.
+
+    The real module is then imported and replaces the stand-in in this module,
+    so importing RoboPandas (e.g. from Examples) does not pay for pandas and numpy.
+    """
+
+    def __init__(self, name, alias):
+        self._name = name
+        self._alias = alias
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+
+pd = _LazyModule('pandas', 'pd')
+numpy = _LazyModule('numpy', 'numpy')
+
+
+def _pandas_exports():
+    return getattr(pd, '__all__', None) or [name for name in dir(pd) if not name.startswith('_')]
+
+
+def __getattr__(name):
+    # The pandas API used to be star imported, so keep it available as keywords
+    # without importing pandas before one of them is used.
+    if not name.startswith(('_', 'ROBOT_')) and name in _pandas_exports():
+        return getattr(pd, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_pandas_exports()))
+
+
+def create_engine(*args, **kwargs):
+    """
+    Creates an SQLAlchemy engine
+    Arguments are passed on to sqlalchemy.create_engine, the first one being the database url
+
+    More information about the database url can be found at
+    https://docs.sqlalchemy.org/en/latest/core/engines.html
+    """
+    from sqlalchemy import create_engine
+    return create_engine(*args, **kwargs)
+
+def dataframe(dataframe_dict, index=None, dtype=object, typed=False, schema=None, **kwargs):
     """
     Creates a dataframe based on the inserted dictionary
     Dict should follow format key: [list of values], even if only 1 value
@@ -16,13 +74,18 @@ def dataframe(dataframe_dict, index=None, dtype=object, **kwargs):
     but {'a':[1,2,7], 'b':[3,4]} will not
     Optional argument is index, which can be one column name
     or multiple column names in a list
+
+    With typed=True or a schema the columns are stored with compact types,
+    see Create Dataframe
     """
     df = pd.DataFrame(dataframe_dict, dtype=dtype, **kwargs)
+    if _is_true(typed) or schema:
+        df = _typed_columns(df, _parse_schema(schema), infer=_is_true(typed))
     if index:
         set_index(df, index)
     return df
 
-def create_dataframe(*args, to_dict=None, set_index=None):
+def create_dataframe(*args, to_dict=None, set_index=None, typed=False, schema=None):
     """Create a dataframe from the arguments.
     
     The keyword needs to know how many columns there are and be able to distinguish column headers from column values.
@@ -36,6 +99,14 @@ def create_dataframe(*args, to_dict=None, set_index=None):
     to this argument and the default orientation 'index' will be used. When another orientation is needed
     (documented here: https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.to_dict.html), the index column
     should be specified in the separate set_index argument and the orientation given in to_dict.
+
+    By default all values are stored as Python objects. For large tables, typed=True stores the columns
+    with compact types instead: columns of whole numbers (without leading zeros) as integers, columns in which
+    values repeat as categories, and other text as the pyarrow string type when pyarrow is installed.
+    A schema gives the types of columns explicitly, as column:type pairs separated by ;
+    e.g. schema=age:int;country:category;name:string. Types are int, float, bool, category, string, datetime
+    or a pandas dtype name. Without typed=True only the columns in the schema are converted.
+    Values are converted back to Python values by to_dict.
     """
 
     source = iter(args)
@@ -43,10 +114,22 @@ def create_dataframe(*args, to_dict=None, set_index=None):
     while not (col_name := next(source)) == '--':
         col_names.append(col_name)
     rows = tuple(row for row in iter(lambda: tuple(islice(source, len(col_names))), ()))
-    df = pd.DataFrame(numpy.array(rows), columns=col_names)
+    if rows and len(rows[-1]) != len(col_names):
+        values = (len(rows) - 1) * len(col_names) + len(rows[-1])
+        raise ValueError(f"Expected a multiple of {len(col_names)} values for the columns {col_names}, got {values}")
     if to_dict and not to_dict in ('dict', 'list', 'series', 'split', 'records', 'index') and not set_index:
         set_index = to_dict
         to_dict = 'index'
+    if to_dict in _ROW_ORIENTATIONS and rows and not (_is_true(typed) or schema) \
+            and len(set(col_names)) == len(col_names) and (not set_index or set_index in col_names) \
+            and set(map(type, args)) == {str}:
+        return _dict_from_rows(col_names, rows, to_dict, col_names.index(set_index) if set_index else None)
+    if _is_true(typed) or schema:
+        # Built from the rows, without the fixed width string array sized to the longest value
+        df = pd.DataFrame.from_records(rows, columns=col_names)
+        df = _typed_columns(df, _parse_schema(schema), infer=_is_true(typed))
+    else:
+        df = pd.DataFrame(numpy.array(rows), columns=col_names)
     if set_index:
         df['_idx_'] = df[set_index]
         set_index = '_idx_'
@@ -56,8 +139,146 @@ def create_dataframe(*args, to_dict=None, set_index=None):
         df = df.to_dict(to_dict)
     return df
 
+# to_dict orientations that are built from the rows without creating a dataframe
+_ROW_ORIENTATIONS = ('index', 'records', 'list', 'dict')
+
+def _dict_from_rows(col_names, rows, orient, key=None):
+    # Gives what DataFrame.to_dict gives after indexing the rows by the column at position key,
+    # keeping the first row of each key. Without key, rows are indexed by their position.
+    if key is not None:
+        unique = {}
+        for row in rows:
+            unique.setdefault(row[key], row)
+        rows = list(unique.values())
+    columns = list(zip(*rows)) if rows else [()] * len(col_names)
+    return _dict_from_columns(col_names, columns, orient, columns[key] if key is not None else None)
+
+def _dict_from_columns(col_names, columns, orient, keys=None):
+    keys = range(len(columns[0]) if columns else 0) if keys is None else keys
+    if orient == 'index':
+        return {key: dict(zip(col_names, row)) for key, row in zip(keys, zip(*columns))}
+    if orient == 'records':
+        return [dict(zip(col_names, row)) for row in zip(*columns)]
+    if orient == 'list':
+        return {col: list(values) for col, values in zip(col_names, columns)}
+    return {col: dict(zip(keys, values)) for col, values in zip(col_names, columns)}
+
+_TYPES = {'int': 'int64', 'integer': 'int64', 'float': 'float64', 'bool': 'boolean', 'boolean': 'boolean',
+          'category': 'category', 'datetime': 'datetime64[ns]'}
+
+def _is_true(value):
+    if isinstance(value, str):
+        return value.lower() not in ('', 'false', 'no', 'none', '0')
+    return bool(value)
+
+def _parse_schema(schema):
+    if not schema:
+        return {}
+    if isinstance(schema, str):
+        schema = dict(pair.rsplit(':', 1) for pair in schema.split(';') if pair.strip())
+    return {col.strip(): str(dtype).strip() for col, dtype in schema.items()}
+
+def _text_dtype():
+    try:
+        importlib.import_module('pyarrow')
+    except ImportError:
+        return None
+    return pd.StringDtype('pyarrow')
+
+def _typed_columns(df, schema, infer=True):
+    # Converts the columns of the schema to their type and, with infer, the other
+    # object columns to the most compact type that keeps their values
+    unknown = set(schema) - set(df.columns)
+    if unknown:
+        raise KeyError(f"Columns {sorted(unknown)} of the schema are not in the dataframe")
+    for col in df.columns:
+        if col in schema:
+            df[col] = _as_type(df[col], schema[col])
+        elif infer and df[col].dtype == object:
+            df[col] = _inferred_type(df[col])
+    return df
+
+def _as_type(values, dtype):
+    dtype = _TYPES.get(dtype.lower(), dtype)
+    if dtype in ('string', 'text'):
+        return values.astype(_text_dtype() or 'string')
+    if dtype == 'boolean' and values.dtype == object:
+        values = values.map(lambda value: _is_true(value) if isinstance(value, str) else value)
+    if dtype == 'datetime64[ns]':
+        return pd.to_datetime(values)
+    return values.astype(dtype)
+
+def _inferred_type(values):
+    kind = pd.api.types.infer_dtype(values, skipna=False)
+    if kind in ('integer', 'floating', 'mixed-integer-float', 'boolean'):
+        return pd.to_numeric(values) if kind != 'boolean' else values.astype(bool)
+    if kind != 'string' or not len(values):
+        return values
+    if values.str.fullmatch(r'-?(0|[1-9][0-9]{0,17})').all():
+        return values.astype('int64')
+    if values.nunique() <= len(values) // 2:
+        return values.astype('category')
+    dtype = _text_dtype()
+    return values.astype(dtype) if dtype else values
+
+# Database engines by url, with the suite that created them and the engine itself.
+_engines = {}
+_suites = []
+
+def _start_suite(data, result):
+    _suites.append(data.longname)
+
+def _end_suite(data, result):
+    suite = _suites.pop() if _suites else None
+    for db_url in [url for url, (owner, _) in _engines.items() if owner == suite]:
+        disconnect_from_database(db_url)
+
+def _close():
+    disconnect_from_database()
+
+def _engine(db_url):
+    if db_url not in _engines:
+        connect_to_database(db_url)
+    return _engines[db_url][1]
+
+def connect_to_database(db_url, **engine_options):
+    """
+    Creates a pooled database engine that is reused by all keywords for this database url
+    Arguments are the database url and optional engine options, e.g.
+    pool_size=5, max_overflow=10, pool_recycle=3600 or echo=True
+
+    Keywords given a database url that is not connected create the engine with default options.
+    The engine is disposed at the end of the suite in which it was created,
+    or explicitly with Disconnect From Database.
+    Connecting again to the same url replaces the engine with one using the new options.
+
+    More information about the database url and the engine options can be found at
+    https://docs.sqlalchemy.org/en/latest/core/engines.html
+    """
+    from sqlalchemy import engine_from_config
+    if db_url in _engines:
+        disconnect_from_database(db_url)
+    # engine_from_config converts option values given as strings to their expected types
+    engine = engine_from_config(dict(engine_options, url=db_url), prefix='')
+    _engines[db_url] = (_suites[-1] if _suites else None, engine)
+
+def disconnect_from_database(db_url=None):
+    """
+    Disposes the pooled engine of the database url, closing its connections
+    When no database url is given, all engines are disposed
+    """
+    for url in [db_url] if db_url else list(_engines):
+        owner, engine = _engines.pop(url, (None, None))
+        if engine is not None:
+            engine.dispose()
+
+def _read_sql_chunks(read, sql, db_url, chunksize, **kwargs):
+    # The connection stays checked out of the pool until the last chunk is read
+    with _engine(db_url).connect().execution_options(stream_results=True) as conn:
+        yield from read(sql, conn, chunksize=int(chunksize), **kwargs)
+
 def create_dataframe_from_table(table, db_url, schema=None,
-                                index=None, return_columns=None):
+                                index=None, return_columns=None, chunksize=None):
     """
     Creates a dataframe from the database table
     Arguments are the table name and the database url
@@ -66,11 +287,13 @@ def create_dataframe_from_table(table, db_url, schema=None,
     which are to be returned and an index (single column) or a
     multi-index (list of columns) can be set
 
+    When chunksize is given, the table is streamed: an iterator of dataframes
+    of at most chunksize rows is returned instead of a single dataframe.
+    The iterator can be used directly as the data of Examples:
+
     More information about the database url can be found at
     https://docs.sqlalchemy.org/en/latest/core/engines.html
     """
-    #maybe good to use a global connection with a
-    #connect_to_database and disconnect_from_database keyword
     table = table.lower()
     if schema:
         schema = schema.lower()
@@ -84,12 +307,14 @@ def create_dataframe_from_table(table, db_url, schema=None,
             index = [i.lower() for i in index]
         else:
             index = index.lower()
-    conn = create_engine(db_url).connect(close_with_result=True)
-    df = pd.read_sql_table(table, conn, schema=schema,
+    if chunksize:
+        return _read_sql_chunks(pd.read_sql_table, table, db_url, chunksize, schema=schema,
+                                columns=return_columns, index_col=index)
+    df = pd.read_sql_table(table, _engine(db_url), schema=schema,
                             columns=return_columns, index_col=index)
     return df
 
-def create_dataframe_from_query(query, db_url, index=None):
+def create_dataframe_from_query(query, db_url, index=None, chunksize=None):
     """
     Creates a dataframe from the query results
     Arguments are the query and the database url
@@ -97,20 +322,207 @@ def create_dataframe_from_query(query, db_url, index=None):
     Optionally an index (single column) or a
     multi-index (list of columns) can be set
 
+    When chunksize is given, the results are streamed: an iterator of dataframes
+    of at most chunksize rows is returned instead of a single dataframe.
+    The iterator can be used directly as the data of Examples:
+
     More information about the database url can be found at
     https://docs.sqlalchemy.org/en/latest/core/engines.html
     """
-    #maybe good to use a global connection with a
-    #connect_to_database and disconnect_from_database keyword
     if index:
         if isinstance(index, list):
             index = [i.lower() for i in index]
         else:
             index = index.lower()
-    conn = create_engine(db_url).connect(close_with_result=True)
-    df = pd.read_sql_query(query, conn, index_col=index)
+    if chunksize:
+        return _read_sql_chunks(pd.read_sql_query, query, db_url, chunksize, index_col=index)
+    df = pd.read_sql_query(query, _engine(db_url), index_col=index)
     return df
 
+def create_dataframe_from_source(source, columns=None, where=None, chunksize=None, **options):
+    """
+    Creates a dataframe from a file or a database
+    Arguments are the source, a file path or a database url
+
+    The kind of file is taken from its extension:
+    - .csv, .tsv and .txt files are read with pandas.read_csv
+    - .jsonl and .ndjson files are read as JSON Lines
+    - .parquet files are read with pyarrow, which must be installed
+    - .xlsx, .xlsm, .xls and .ods files are read with Read Excel, the
+    sheet_name option selects the sheet (by default the first one)
+    For a database url, the table option or the query option gives the rows
+
+    Optional arguments are:
+    - columns, the columns to return, in a list or separated by ;
+    Only these columns, and those used in where, are read
+    - where, only rows matching this condition are returned. For a database
+    this is an SQL condition that is added to the query, for files it is in
+    the Pandas query format, see Query Dataframe
+    - chunksize, when given the rows are streamed, as described for
+    Create Dataframe From Query. Excel sheets are always read completely
+    Other options are passed on to the pandas function reading the source,
+    e.g. sep or dtype for csv files
+
+    Examples:
+    | ${df}= | Create Dataframe From Source | ${CURDIR}/data.csv | columns=name;country | where=age > 30 |
+    | ${df}= | Create Dataframe From Source | sqlite:///data.db | table=visitors | where=age > 30 |
+    """
+    if isinstance(columns, str):
+        columns = [col.strip() for col in columns.split(';') if col.strip()]
+    chunksize = int(chunksize) if chunksize else None
+    if '://' in source:
+        return _read_sql_source(source, columns, where, chunksize, **options)
+    extension = os.path.splitext(source)[1].lower()
+    if extension in ('.xlsx', '.xlsm', '.xls', '.ods'):
+        df = read_excel(source, options.pop('sheet_name', 0), **options)
+        return _select_rows(df, columns, where)
+    if extension == '.parquet':
+        read, header = _parquet_reader(source, chunksize)
+    elif extension in ('.jsonl', '.ndjson'):
+        read = lambda usecols: pd.read_json(source, lines=True, chunksize=chunksize, **options)
+        header = None
+    elif extension in ('.csv', '.tsv', '.txt'):
+        if extension == '.tsv':
+            options.setdefault('sep', '\t')
+        read = lambda usecols: pd.read_csv(source, usecols=usecols, chunksize=chunksize, **options)
+        header = lambda: pd.read_csv(source, nrows=0, **options).columns
+    else:
+        raise ValueError(f"Unknown kind of source '{source}', expected a csv, jsonl, parquet or excel file, "
+                         "or a database url")
+    usecols = None
+    if columns and header:
+        # Columns only used in the where condition are read too. This is a simple text match,
+        # so it may read a few columns that are not needed.
+        usecols = [col for col in header() if col in columns or (where and str(col) in where)]
+    frames = read(usecols)
+    if not chunksize:
+        return _select_rows(frames, columns, where)
+    return (_select_rows(df, columns, where) for df in frames)
+
+def _read_sql_source(db_url, columns, where, chunksize, table=None, query=None, **options):
+    import sqlalchemy as sa
+    if bool(table) == bool(query):
+        raise ValueError('A database source needs either the table or the query option')
+    rows = sa.table(table) if table else sa.text(query).columns().subquery('source')
+    statement = sa.select(*[sa.column(col) for col in columns or ()] or [sa.text('*')]).select_from(rows)
+    if where:
+        statement = statement.where(sa.text(where))
+    return create_dataframe_from_query(statement, db_url, chunksize=chunksize, **options)
+
+def _parquet_reader(source, chunksize):
+    import pyarrow.parquet
+    parquet = pyarrow.parquet.ParquetFile(source)
+    if chunksize:
+        read = lambda usecols: (batch.to_pandas() for batch in
+                                parquet.iter_batches(batch_size=chunksize, columns=usecols))
+    else:
+        read = lambda usecols: parquet.read(columns=usecols).to_pandas()
+    return read, lambda: parquet.schema_arrow.names
+
+def _select_rows(df, columns, where):
+    if where:
+        df = _query(df, where)
+    if columns:
+        df = df[columns]
+    return df
+
+# Parsed excel sheets, least recently used first. See Set Excel Cache.
+_excel_cache = OrderedDict()
+_excel_cache_size = 16
+_excel_cache_dir = None
+
+def set_excel_cache(size=16, directory=None):
+    """
+    Configures the cache of parsed excel sheets used by Read Excel
+    The cache is shared by all suites run by the same process. Sheets are cached by
+    path, modification time, sheet name and read options, so a changed workbook is read again.
+
+    Optional arguments are:
+    - size (default 16), how many sheets to keep in memory, the least recently used
+    sheet is evicted first. A size of 0 disables the in memory cache
+    - directory (default None), when given the parsed sheets are also pickled to this
+    directory, so that later runs do not need to parse the workbook again
+    """
+    global _excel_cache_size, _excel_cache_dir
+    _excel_cache_size = int(size)
+    _excel_cache_dir = directory
+    while len(_excel_cache) > _excel_cache_size:
+        _excel_cache.popitem(last=False)
+
+def _excel_cache_key(excel, sheet_name, noreplace, kwargs):
+    if not isinstance(excel, (str, os.PathLike)):
+        return None
+    stat = os.stat(excel)
+    return (os.path.abspath(excel), stat.st_mtime_ns, stat.st_size, sheet_name, noreplace,
+            tuple(sorted((arg, repr(value)) for arg, value in kwargs.items())))
+
+def _replaced_columns(columns, noreplace):
+    if not noreplace:
+        return list(columns)
+    return [col for col in columns
+            if not any(filter(lambda pat:fnmatch(col, pat), noreplace.split(';')))]
+
+def _replace_variables(df, columns):
+    # Only string cells containing ${ are resolved, each distinct string once.
+    # Other cells, and columns that are not of object dtype, are left untouched.
+    builtin = None
+    resolved = {}
+    for col in columns:
+        values = df[col]
+        if values.dtype != object:
+            continue
+        try:
+            templated = values.str.contains('${', regex=False, na=False)
+        except AttributeError:
+            continue
+        if not templated.any():
+            continue
+        builtin = builtin or BuiltIn()
+        templates = values[templated]
+        for template in templates.unique():
+            if template not in resolved:
+                resolved[template] = builtin.replace_variables(template)
+        values = values.copy()
+        values[templated] = templates.map(resolved)
+        df[col] = values
+
+def _parse_sheet(excel, sheet_name, noreplace, kwargs):
+    # Returns a copy, the cached dataframe is never handed out to be modified
+    key = _excel_cache_key(excel, sheet_name, noreplace, kwargs)
+    if key in _excel_cache:
+        _excel_cache.move_to_end(key)
+        return _excel_cache[key].copy()
+    pickled = None
+    if key and _excel_cache_dir:
+        pickled = os.path.join(_excel_cache_dir, hashlib.sha1(repr(key).encode()).hexdigest() + '.pkl')
+    if pickled and os.path.exists(pickled):
+        df = pd.read_pickle(pickled)
+    else:
+        kwargs = dict(kwargs)
+        with pd.ExcelFile(excel, engine=kwargs.pop('engine', None)) as workbook:
+            kept = []
+            if noreplace != '*':
+                # Cells to be replaced are kept as read, e.g. the text 007 is not turned into the number 7.
+                # Columns read as objects are only inferred from the values, like converters returning the
+                # cells would be: whole columns of numbers, bools or dates get their dtype, text is not parsed.
+                columns = workbook.parse(sheet_name, nrows=0).columns
+                dtype = kwargs.get('dtype')
+                if dtype is None or isinstance(dtype, dict):
+                    kept = [col for col in _replaced_columns(columns, noreplace) if col not in (dtype or {})]
+                    kwargs['dtype'] = {**dict.fromkeys(kept, object), **(dtype or {})}
+            df = workbook.parse(sheet_name, **kwargs)
+            for col in kept:
+                if col in df.columns and not df[col].isna().any():
+                    df[col] = df[col].infer_objects()
+        if pickled:
+            os.makedirs(_excel_cache_dir, exist_ok=True)
+            df.to_pickle(pickled)
+    if key and _excel_cache_size > 0:
+        _excel_cache[key] = df
+        while len(_excel_cache) > _excel_cache_size:
+            _excel_cache.popitem(last=False)
+    return df.copy()
+
 def read_excel(excel, sheet_name, set_index=None, to_dict=None, query=None, noreplace=None, **kwargs):
     """
     Converts an excel sheet to a dataframe
@@ -133,7 +545,9 @@ def read_excel(excel, sheet_name, set_index=None, to_dict=None, query=None, nore
     Additional options as documented in the pandas library are available here:
     https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.read_excel.html
 
-    Robot Framework variables in the spreadsheet are resolved as
+    Parsed sheets are cached, see Set Excel Cache.
+
+    Robot Framework variables in the spreadsheet are resolved after
     the sheet is read in. This behaviour can be disabled with the option:
     - noreplace=*
     noreplace can also match column names using patterns (with * and ? wildcards)
@@ -143,21 +557,21 @@ def read_excel(excel, sheet_name, set_index=None, to_dict=None, query=None, nore
         if arg in ('header', 'nrows'):
             kwargs[arg] = int(kwargs[arg])
 
-    if noreplace == '*':
-        converters=None
-    else:
-        columns = pd.read_excel(excel, sheet_name=sheet_name, nrows=0).columns
-        replacer = lambda value:BuiltIn().replace_variables(value) if isinstance(value, str) and '${' in value else value
-        if noreplace:
-            converters = {col: replacer for col in columns
-                      if not any(filter(lambda pat:fnmatch(col, pat), noreplace.split(';')))}
-        else:
-            converters = {col: replacer for col in columns}
+    df = _parse_sheet(excel, sheet_name, noreplace, kwargs)
 
-    df = pd.read_excel(excel, sheet_name=sheet_name, converters=converters, **kwargs)
+    if noreplace != '*':
+        _replace_variables(df, _replaced_columns(df.columns, noreplace))
 
     if query:
-        df = df.query(query)
+        df = _query(df, query)
+
+    if to_dict in _ROW_ORIENTATIONS and isinstance(set_index, str) and df.columns.is_unique \
+            and set_index in df.columns and not df[set_index].isna().any():
+        unique = ~df[set_index].duplicated()
+        if not unique.all():
+            df = df[unique]
+        columns = [df[col].tolist() for col in df.columns]
+        return _dict_from_columns(list(df.columns), columns, to_dict, columns[df.columns.get_loc(set_index)])
 
     if set_index:
         df['_idx_'] = df[set_index]
@@ -181,11 +595,14 @@ def set_index(df, index, append=False, inplace=True):
     to append the index to the existing index
     - inplace (default True, can be True or False) which determines whether
     to change the existing dataframe, or return a new dataframe
+    The resulting dataframe is returned in both cases, see Chain Dataframe Keywords
 
     Note that if append is not true, the original index will be dropped
     """
-    df = df.set_index(index, append=append, inplace=inplace)
-    return df
+    if inplace:
+        _invalidate_lookup_indexes(df)
+    result = df.set_index(index, append=append, inplace=inplace)
+    return df if inplace else result
 
 def reset_index(df, drop_index_columns=True, inplace=True):
     """
@@ -195,9 +612,12 @@ def reset_index(df, drop_index_columns=True, inplace=True):
     to drop or keep the column(s) that are used as the index
     - inplace (default True, can be True or False) which determines whether
     to change the existing dataframe, or return a new dataframe
+    The resulting dataframe is returned in both cases, see Chain Dataframe Keywords
     """
-    df = df.reset_index(drop=drop_index_columns,inplace=inplace)
-    return df
+    if inplace:
+        _invalidate_lookup_indexes(df)
+    result = df.reset_index(drop=drop_index_columns,inplace=inplace)
+    return df if inplace else result
 
 def add_dataframe_column(df, column, values):
     """
@@ -205,7 +625,9 @@ def add_dataframe_column(df, column, values):
     Arguments are the dataframe, column name
     and a list of values
     The value count must match the row count
+    The dataframe is changed and returned
     """
+    _invalidate_lookup_indexes(df)
     df[column] = values
     return df
 
@@ -215,10 +637,88 @@ def drop_dataframe_columns(df, columns, inplace=True):
     Arguments are the dataframe and the columns (in list format)
     Optionally, inplace can be set (default True, can be True or False) which
     determines whether to change the existing dataframe, or return a new dataframe
+    The resulting dataframe is returned in both cases, see Chain Dataframe Keywords
+    """
+    if inplace:
+        _invalidate_lookup_indexes(df)
+    result = df.drop(columns=columns, inplace=inplace)
+    return df if inplace else result
+
+def _probed_rows(right, left, left_keys, right_keys, merge_type):
+    # For a lookup index, inner and left merges only need the rows of the indexed dataframe
+    # with a key of the left dataframe. The merge of those gives the same result as the
+    # merge with the whole dataframe, in the same order as they are taken in index order.
+    if not isinstance(right, _LookupIndex):
+        return right
+    left_keys = [left_keys] if isinstance(left_keys, str) else list(left_keys)
+    right_keys = [right_keys] if isinstance(right_keys, str) else list(right_keys)
+    if merge_type not in ('inner', 'left') or right_keys != right.columns:
+        return right.df
+    if left[left_keys].isna().to_numpy().any():
+        # The merge matches missing keys with each other, the lookup of a missing key finds nothing
+        return right.df
+    keys = left[left_keys].drop_duplicates().itertuples(index=False, name=None)
+    positions = [right.positions(key) for key in keys]
+    if not positions:
+        return right.df.iloc[:0]
+    return right.df.iloc[numpy.sort(numpy.concatenate(positions))]
+
+def set_copy_on_write(enabled=True):
+    """
+    Enables or disables the copy on write mode of pandas, for all dataframes
+    Optional argument is enabled (default True, can be True or False)
+
+    With copy on write, dataframes derived from another dataframe, e.g. by
+    Drop Dataframe Columns or Reset Index with inplace=False, share its data
+    until one of them is changed, instead of copying it right away.
+    Returns whether the mode was enabled before, so it can be restored
+
+    See https://pandas.pydata.org/docs/user_guide/copy_on_write.html
+    """
+    previous = pd.get_option('mode.copy_on_write')
+    pd.set_option('mode.copy_on_write', _is_true(enabled))
+    return previous
+
+def chain_dataframe_keywords(dataframe, *keywords):
+    """
+    Runs keywords one after the other on a dataframe and returns the result
+    Arguments are the dataframe and the keywords with their arguments, separated by AND.
+    Each keyword gets the dataframe returned by the previous one as its first argument
+
+    The keywords work on a copy of the dataframe, which is not changed. With copy on write
+    (see Set Copy On Write) this copy shares the data with the dataframe, so keywords changing
+    the dataframe in place, like Set Index or Drop Dataframe Columns, do not copy the data.
+    Without copy on write the dataframe is copied once before the first keyword
+
+    Examples:
+    | ${result}= | Chain Dataframe Keywords | ${df} | Set Index | name |
+    | ... | AND | Drop Dataframe Columns | ${unused columns} |
+    | ... | AND | Sort Dataframe | age |
     """
-    df.drop(columns=columns, inplace=inplace)
+    df = dataframe.copy(deep=not pd.get_option('mode.copy_on_write'))
+    steps = [[]]
+    for arg in keywords:
+        if isinstance(arg, str) and arg == 'AND':
+            steps.append([])
+        else:
+            steps[-1].append(arg)
+    builtin = BuiltIn()
+    for name, *args in filter(None, steps):
+        result = builtin.run_keyword(name, df, *map(_escaped, args))
+        if result is not None:
+            df = result
     return df
 
+def _escaped(arg):
+    # Run Keyword replaces variables and escapes in the arguments again, they are escaped to be passed as given.
+    # The name of a named argument, like order in order=descending, is left as it is.
+    if not isinstance(arg, str):
+        return arg
+    name, equals, value = arg.partition('=')
+    if equals and name.isidentifier():
+        return f'{name}={escape(value)}'
+    return escape(arg)
+
 def merge_dataframes_with_same_key_names(dataframe1, dataframe2, key_names, merge_type='inner',
                                             suffixes=['_df1', '_df2'], sort=False):
     """
@@ -230,7 +730,12 @@ def merge_dataframes_with_same_key_names(dataframe1, dataframe2, key_names, merg
     - merge_type (inner, left, right or outer, inner by default)
     - suffixes (list like, default '_df1', '_df2')
     - sort (True or False, default False)
+
+    The right dataframe can also be a lookup index on the keys, see Create Lookup Index.
+    Inner and left merges with the same large dataframe are then much faster, as only
+    the rows with the keys of the left dataframe are looked up and merged
     """
+    dataframe2 = _probed_rows(dataframe2, dataframe1, key_names, key_names, merge_type)
     df = dataframe1.merge(dataframe2, on=key_names, how=merge_type, suffixes=suffixes, sort=sort)
     return df
 
@@ -246,7 +751,11 @@ def merge_dataframes_with_different_key_names(dataframe1, dataframe2, key_names_
     - merge_type (inner, left, right or outer, inner by default)
     - suffixes (list like, default '_df1', '_df2')
     - sort (True or False, default False)
+
+    The right dataframe can also be a lookup index on the right keys, as described in
+    Merge Dataframes With Same Key Names
     """
+    dataframe2 = _probed_rows(dataframe2, dataframe1, key_names_left, key_names_right, merge_type)
     df = dataframe1.merge(dataframe2, left_on=key_names_left, right_on=key_names_right,
                             how=merge_type, suffixes=suffixes, sort=sort)
     return df
@@ -269,6 +778,143 @@ def use_map(df, column, map_df):
     """
     return df[df[column].map(map_df, na_action='ignore')]
 
+# Compiled queries by query string, least recently used first. See Set Query Cache.
+_query_cache = OrderedDict()
+_query_cache_size = 256
+_query_statistics = dict.fromkeys(('hits', 'misses', 'compiled', 'evaluated'), 0)
+
+_COMPARISONS = {ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt,
+                ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge}
+
+def set_query_cache(size=256):
+    """
+    Configures the cache of compiled queries used by Query Dataframe, and by
+    the query of Read Excel and the where of Create Dataframe From Source
+
+    Simple queries, comparing columns with values or with each other using
+    ==, !=, <, <=, >, >=, in and not in and combining those with and, or, not
+    or with parenthesised &, | and ~, are compiled once to a function selecting the rows.
+    Other queries, e.g. with @ variables or arithmetic, are evaluated by
+    DataFrame.query, which uses numexpr when it is installed
+
+    Optional argument is size (default 256), how many queries to keep,
+    the least recently used query is evicted first. A size of 0 disables the cache
+    """
+    global _query_cache_size
+    _query_cache_size = int(size)
+    while len(_query_cache) > _query_cache_size:
+        _query_cache.popitem(last=False)
+
+def get_query_cache_statistics(reset=False):
+    """
+    Returns a dictionary with the statistics of the query cache:
+    - hits and misses, how often a query was or was not in the cache
+    - compiled, how many rows selections were made by compiled queries
+    - evaluated, how many were passed on to DataFrame.query
+    - size and max_size, how many queries are and can be in the cache
+    Optionally, reset (default False) sets the counts back to 0
+    """
+    statistics = dict(_query_statistics, size=len(_query_cache), max_size=_query_cache_size)
+    if reset:
+        _query_statistics.update(dict.fromkeys(_query_statistics, 0))
+    return statistics
+
+def _compile_query(query):
+    # Returns a function giving the boolean mask of the rows selected by query,
+    # or None when the query is not simple enough, see Set Query Cache
+    try:
+        return _compile_node(ast.parse(query.strip(), mode='eval').body)
+    except (SyntaxError, ValueError):
+        return None
+
+def _compile_node(node):
+    if isinstance(node, ast.BoolOp):
+        combine = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+        parts = [_compile_node(value) for value in node.values]
+        def mask(df):
+            result = parts[0](df)
+            for part in parts[1:]:
+                result = combine(result, part(df))
+            return result
+        return mask
+    # & and | bind stronger than comparisons in Python but not in pandas queries,
+    # so only their parenthesised use has the same meaning in both
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.BitAnd, ast.BitOr)):
+        combine = operator.and_ if isinstance(node.op, ast.BitAnd) else operator.or_
+        left, right = _compile_node(node.left), _compile_node(node.right)
+        return lambda df: combine(left(df), right(df))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.Invert)):
+        operand = _compile_node(node.operand)
+        return lambda df: ~operand(df)
+    if isinstance(node, ast.Compare) and len(node.ops) == 1:
+        return _compile_comparison(node.left, node.ops[0], node.comparators[0])
+    raise ValueError(f'Not a simple query: {ast.dump(node)}')
+
+def _compile_comparison(left, op, right):
+    if not isinstance(left, ast.Name):
+        left, right = right, left
+        op = {ast.Lt: ast.Gt, ast.LtE: ast.GtE, ast.Gt: ast.Lt, ast.GtE: ast.LtE}.get(type(op), type(op))()
+        if not isinstance(left, ast.Name) or isinstance(op, (ast.In, ast.NotIn)):
+            raise ValueError('A comparison needs a column')
+    column = left.id
+    if isinstance(right, ast.Name):
+        other = right.id
+        if isinstance(op, (ast.In, ast.NotIn)):
+            raise ValueError('Membership in a column is not compiled')
+        if other == column and isinstance(op, (ast.Eq, ast.NotEq)):
+            # The not null check, a missing value is not equal to itself
+            missing = isinstance(op, ast.NotEq)
+            return lambda df: pd.isna(_query_column(df, column)) == missing
+        compare = _COMPARISONS[type(op)]
+        return lambda df: compare(df[column], df[other])
+    value = ast.literal_eval(right)
+    if isinstance(value, (list, tuple, set)):
+        # Like in pandas queries, == and != with a list test membership
+        if not isinstance(op, (ast.In, ast.NotIn, ast.Eq, ast.NotEq)):
+            raise ValueError('Only membership is compiled for lists')
+        values = list(value)
+        if isinstance(op, (ast.In, ast.Eq)):
+            return lambda df: df[column].isin(values).to_numpy()
+        return lambda df: ~df[column].isin(values).to_numpy()
+    if isinstance(op, (ast.In, ast.NotIn)) or value is None:
+        raise ValueError('Membership needs a list, and None is compared by pandas')
+    compare = _COMPARISONS[type(op)]
+    return lambda df: compare(_query_column(df, column), value)
+
+def _query_column(df, column):
+    # Comparing the numpy array is several times faster than comparing the Series for object columns.
+    # Other columns, e.g. dates that are compared with strings, are compared by pandas.
+    values = df[column]
+    if not isinstance(values, pd.Series):
+        raise KeyError(f'Column {column} is not unique')
+    if isinstance(values.dtype, numpy.dtype) and values.dtype.kind in 'Oiufb':
+        return values.to_numpy()
+    return values
+
+def _query(df, query):
+    if query in _query_cache:
+        _query_statistics['hits'] += 1
+        _query_cache.move_to_end(query)
+        mask = _query_cache[query]
+    else:
+        _query_statistics['misses'] += 1
+        mask = _compile_query(query)
+        if _query_cache_size > 0:
+            _query_cache[query] = mask
+            while len(_query_cache) > _query_cache_size:
+                _query_cache.popitem(last=False)
+    if mask is not None:
+        try:
+            selection = mask(df)
+        except (KeyError, TypeError, ValueError):
+            # e.g. a name that is not a column but an index level, which DataFrame.query resolves
+            pass
+        else:
+            _query_statistics['compiled'] += 1
+            return df[selection]
+    _query_statistics['evaluated'] += 1
+    return df.query(query)
+
 def query_dataframe(dataframe, query, return_columns=None, offset=0):
     """
     Find a row, or multiple rows through the query
@@ -288,12 +934,157 @@ def query_dataframe(dataframe, query, return_columns=None, offset=0):
     Make sure to use quotes around the values inside the query
 
     Learn more at http://jose-coto.com/query-method-pandas
+
+    Queries like these examples, comparing columns with values or each other and
+    combined with and, or and not, are compiled once to a function selecting the
+    rows, see Set Query Cache. Other queries are passed on to DataFrame.query
     """
-    df = dataframe.query(query)
+    df = _query(dataframe, query)
     if return_columns:
         df = df[return_columns]
     return df[offset:]
 
+# Lookup indexes by id of their dataframe, see Create Lookup Index
+_lookup_indexes = {}
+
+class _LookupIndex(object):
+    """Row positions of a dataframe by key, built when first used and again after the dataframe changed.
+
+    The hash map gives the positions of the rows with a key, the sorted index
+    (only built for range lookups) the positions ordered by the first key column.
+    """
+
+    def __init__(self, df, columns):
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            raise KeyError(f"Columns {missing} not in the dataframe")
+        self.df = df
+        self.columns = columns
+        self._positions = None
+        self._sorted = None
+
+    def __repr__(self):
+        return f"<lookup index on {self.columns} of {len(self.df)} rows>"
+
+    def invalidate(self):
+        self._positions = self._sorted = None
+
+    def _register(self):
+        _lookup_indexes.setdefault(id(self.df), weakref.WeakSet()).add(self)
+
+    def _key_value(self, value, col):
+        # Robot Framework passes strings, numeric columns are looked up by number
+        dtype = self.df[col].dtype
+        if isinstance(value, str) and dtype.kind in 'iuf':
+            return dtype.type(value)
+        return value
+
+    def positions(self, key):
+        if len(key) != len(self.columns):
+            raise ValueError(f"Expected a key of {len(self.columns)} values for {self.columns}, got {list(key)}")
+        if self._positions is None:
+            self._register()
+            grouped = self.df.groupby(self.columns if len(self.columns) > 1 else self.columns[0],
+                                      sort=False, dropna=False)
+            self._positions = grouped.indices
+        key = tuple(self._key_value(value, col) for value, col in zip(key, self.columns))
+        positions = self._positions.get(key if len(key) > 1 else key[0])
+        return numpy.empty(0, dtype=numpy.intp) if positions is None else positions
+
+    def range_positions(self, low, high, include_low, include_high):
+        col = self.columns[0]
+        if self._sorted is None:
+            self._register()
+            values = self.df[col].to_numpy()
+            order = numpy.argsort(values, kind='stable')
+            self._sorted = (values[order], order)
+        values, order = self._sorted
+        start = 0 if low is None else values.searchsorted(self._key_value(low, col),
+                                                          'left' if include_low else 'right')
+        end = len(values) if high is None else values.searchsorted(self._key_value(high, col),
+                                                                    'right' if include_high else 'left')
+        return numpy.sort(order[start:end])
+
+    def rows(self, positions, return_columns, to_dict):
+        df = self.df.iloc[positions]
+        if return_columns:
+            df = df[_column_list(return_columns)]
+        if to_dict:
+            return df.to_dict(to_dict)
+        return df
+
+def _column_list(columns):
+    if isinstance(columns, str):
+        return [col.strip() for col in columns.split(';') if col.strip()]
+    return list(columns)
+
+def _invalidate_lookup_indexes(df):
+    for index in _lookup_indexes.pop(id(df), ()):
+        index.invalidate()
+
+def create_lookup_index(dataframe, columns):
+    """
+    Creates an index to look up rows of the dataframe by the values of one or more columns
+    Arguments are the dataframe and the column, or the columns in a list or separated by ;
+
+    Use the index with Lookup Rows, Lookup Row and Lookup Range instead of
+    Query Dataframe when the same dataframe is searched many times. The query is
+    then not parsed and the column not scanned again for every search.
+
+    The index is built on first use. It is built again when the dataframe was changed
+    by Set Index, Reset Index, Add Dataframe Column, Drop Dataframe Columns or
+    Sort Dataframe, changes made in other ways are not noticed.
+
+    Examples:
+    | ${index}= | Create Lookup Index | ${visitors} | name |
+    | ${rows}= | Lookup Rows | ${index} | Arthur |
+    | ${index}= | Create Lookup Index | ${visitors} | name;place |
+    | ${row}= | Lookup Row | ${index} | Arthur | Camelot |
+    """
+    return _LookupIndex(dataframe, _column_list(columns))
+
+def lookup_rows(index, *key, return_columns=None, to_dict=None):
+    """
+    Finds the rows with the key, in the order of the dataframe
+    Arguments are an index from Create Lookup Index and a value for each of its columns
+
+    Optionally the columns to be returned can be set, in a list or separated by ;
+    and to_dict converts the rows like in Create Dataframe, e.g. to_dict=records
+    returns a list of dicts
+    """
+    return index.rows(index.positions(key), return_columns, to_dict)
+
+def lookup_row(index, *key, return_columns=None):
+    """
+    Returns the first row with the key as a dictionary
+    Arguments are an index from Create Lookup Index and a value for each of its columns
+    Fails when no row has the key
+
+    Optionally the columns to be returned can be set, in a list or separated by ;
+    """
+    positions = index.positions(key)
+    if not len(positions):
+        raise KeyError(f"No row with {dict(zip(index.columns, key))}")
+    row = index.df.iloc[positions[0]]
+    if return_columns:
+        row = row[_column_list(return_columns)]
+    return row.to_dict()
+
+def lookup_range(index, low=None, high=None, include_low=True, include_high=True,
+                 return_columns=None, to_dict=None):
+    """
+    Finds the rows of which the first column of the index is between low and high,
+    in the order of the dataframe
+    Arguments are an index from Create Lookup Index and the low and high value.
+    Without low or high, the range is open at that side
+
+    Optional arguments are:
+    - include_low and include_high (default True), whether rows equal to low or high are found
+    - return_columns and to_dict, as in Lookup Rows
+    """
+    positions = index.range_positions(low, high, include_low, include_high)
+    return index.rows(positions, return_columns, to_dict)
+
 def get_dataframe_head(dataframe, number=5):
     """
     Gets the first number of results (5 by default) from the dataframe
@@ -325,11 +1116,13 @@ def sort_dataframe(dataframe, sort_column, order='ascending', nulls_position='la
     whether null values (NaN) are sorted first or last
     - inplace (default True, can be True or False) which determines whether
     to change the existing dataframe, or return a new dataframe
+    The resulting dataframe is returned in both cases, see Chain Dataframe Keywords
     """
     if order == 'ascending':
         ascending = True
     else:
         ascending = False
-    df = dataframe.sort_values(sort_column, ascending=ascending, na_position=nulls_position, inplace=inplace)
-    if not inplace:
-        return df
+    if inplace:
+        _invalidate_lookup_indexes(dataframe)
+    result = dataframe.sort_values(sort_column, ascending=ascending, na_position=nulls_position, inplace=inplace)
+    return dataframe if inplace else result
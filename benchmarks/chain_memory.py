@@ -0,0 +1,122 @@
+"""Check that a chain of RoboPandas keywords does not copy the dataframe, with and without copy on write.
+
+Runs the steps of a typical chain on a dataframe of several column types and reports, per step, the memory
+allocated and the peak traced while it ran. A step with a peak of at least half the dataframe copied
+(part of) it. The whole chain is also run with Chain Dataframe Keywords.
+With --check the exit status is 1 when a step copies with copy on write.
+Run from the repository root::
+
+    python benchmarks/chain_memory.py --rows 1000000 --check
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import RoboPandas
+from robot.libraries.BuiltIn import BuiltIn
+from robot_context import run_in_robot
+
+# Keyword, arguments and named arguments. FLAGS stands for a new boolean column of the dataframe's length.
+FLAGS = object()
+STEPS = (
+    ('Set Index', ['id'], {}),
+    ('Add Dataframe Column', ['flag', FLAGS], {}),
+    ('Drop Dataframe Columns', [['amount']], {}),
+    ('Reset Index', [], {'drop_index_columns': False}),
+    ('Set Index', ['group'], {}),
+    ('Drop Dataframe Columns', [['flag']], {}),
+    ('Reset Index', [], {'drop_index_columns': False}),
+    ('Get Dataframe Head', [1000], {}),
+)
+
+
+def reference(rows):
+    numpy = RoboPandas.numpy
+    return RoboPandas.pd.DataFrame({
+        'id': numpy.arange(rows),
+        'group': numpy.arange(rows) % 100,
+        'amount': numpy.arange(rows) * 0.5,
+        'ratio': numpy.arange(rows) / rows,
+        'name': [f'name {row}' for row in range(rows)],
+    })
+
+
+def arguments(args, rows):
+    return [RoboPandas.numpy.zeros(rows, dtype=bool) if arg is FLAGS else arg for arg in args]
+
+
+def traced_steps(df, copy_on_write):
+    previous = RoboPandas.set_copy_on_write(copy_on_write)
+    size = df.memory_usage(deep=True).sum()
+    results = []
+    try:
+        tracemalloc.start()
+        for name, args, kwargs in [('Copy', [], {})] + list(STEPS):
+            args = arguments(args, len(df))
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            if name == 'Copy':
+                # As done by Chain Dataframe Keywords
+                df = df.copy(deep=not copy_on_write)
+            else:
+                df = getattr(RoboPandas, name.lower().replace(' ', '_'))(df, *args, **kwargs)
+            current, peak = tracemalloc.get_traced_memory()
+            results.append({'benchmark': 'chain_memory', 'copy_on_write': copy_on_write, 'step': name,
+                            'allocated_mb': (current - before) / 2 ** 20, 'peak_mb': (peak - before) / 2 ** 20,
+                            'copied': bool(peak - before >= size / 2)})
+    finally:
+        tracemalloc.stop()
+        RoboPandas.set_copy_on_write(previous)
+    return results
+
+
+def chained(df, copy_on_write):
+    args = []
+    for name, step_args, kwargs in STEPS:
+        args += (['AND'] if args else []) + [name] + arguments(step_args, len(df))
+        args += [f'{key}={value}' for key, value in kwargs.items()]
+
+    def chain():
+        BuiltIn().import_library('RoboPandas')
+        previous = RoboPandas.set_copy_on_write(copy_on_write)
+        tracemalloc.start()
+        try:
+            RoboPandas.chain_dataframe_keywords(df, *args)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            RoboPandas.set_copy_on_write(previous)
+
+    peak = run_in_robot(chain)
+    return {'benchmark': 'chain_memory', 'copy_on_write': copy_on_write, 'step': 'Chain Dataframe Keywords',
+            'peak_mb': peak / 2 ** 20, 'copied': bool(peak >= df.memory_usage(deep=True).sum() / 2)}
+
+
+def run(rows=1000000):
+    df = reference(rows)
+    results = []
+    for copy_on_write in (False, True):
+        for result in traced_steps(df, copy_on_write) + [chained(df, copy_on_write)]:
+            results.append(dict(result, rows=rows))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--check', action='store_true', help='fail when a step copies with copy on write')
+    options = parser.parse_args()
+    results = run(options.rows)
+    for result in results:
+        allocated = f"{result['allocated_mb']:>8.1f} MB" if 'allocated_mb' in result else ' ' * 11
+        print(f"copy on write {str(result['copy_on_write']):<5} {result['step']:<25} {allocated} "
+              f"peak {result['peak_mb']:>8.1f} MB{'  COPY' if result['copied'] else ''}")
+    if options.check and any(result['copied'] for result in results if result['copy_on_write']):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
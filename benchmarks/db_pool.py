@@ -0,0 +1,60 @@
+"""Compare per query latency with a new engine per query and with the pooled engine registry.
+
+A local SQLite file is used, so the numbers show the engine and connection setup
+overhead rather than network latency. Run from the repository root::
+
+    python benchmarks/db_pool.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import RoboPandas
+
+QUERY = 'select * from people where id = 42'
+
+
+def create_database(path, rows=1000):
+    with sqlite3.connect(path) as db:
+        db.execute('drop table if exists people')
+        db.execute('create table people (id integer primary key, name text, place text)')
+        db.executemany('insert into people values (?, ?, ?)',
+                       ((row, f'name {row}', f'place {row % 10}') for row in range(rows)))
+
+
+def new_engine_per_query(db_url):
+    # What every lookup did before engines were pooled
+    return RoboPandas.pd.read_sql_query(QUERY, RoboPandas.create_engine(db_url))
+
+
+def pooled_engine(db_url):
+    return RoboPandas.create_dataframe_from_query(QUERY, db_url)
+
+
+def run(queries=500):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        db_url = f"sqlite:///{os.path.join(directory, 'people.db')}"
+        create_database(os.path.join(directory, 'people.db'))
+        for name, func in (('new_engine', new_engine_per_query), ('pooled', pooled_engine)):
+            func(db_url)
+            start = time.perf_counter()
+            for _ in range(queries):
+                func(db_url)
+            results.append({'benchmark': 'db_pool', 'mode': name, 'queries': queries,
+                            'per_query_ms': (time.perf_counter() - start) / queries * 1000})
+        RoboPandas.disconnect_from_database()
+    return results
+
+
+def main():
+    for result in run():
+        print(f"{result['mode']:<12} {result['per_query_ms']:>8.3f} ms per query")
+
+
+if __name__ == '__main__':
+    main()
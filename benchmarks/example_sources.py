@@ -0,0 +1,68 @@
+"""Compare reading Examples: rows from a csv file as a source with building them as a list of arguments.
+
+The list is how a large table had to be given before sources: every value of the file as a
+Robot Framework list, headers first. The source reads only two columns and the matching rows in chunks.
+Run from the repository root::
+
+    python benchmarks/example_sources.py --rows 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Examples
+import RoboPandas
+
+
+def create_csv(path, rows, columns=8):
+    data = {f'column {col}': [f'value {row}.{col}' for row in range(rows)] for col in range(columns)}
+    data['selected'] = [row % 10 for row in range(rows)]
+    RoboPandas.pd.DataFrame(data).to_csv(path, index=False)
+
+
+def as_arguments(path):
+    df = RoboPandas.pd.read_csv(path)
+    args = list(df.columns) + ['--'] + [str(value) for row in df.itertuples(index=False) for value in row]
+    col_names, rows = Examples._example_records(args)
+    return [row[:2] for row in rows if row[-1] == '0']
+
+
+def from_source(path):
+    col_names, rows = Examples._example_records([f'source={path}', 'columns=column 0;column 1', 'where=selected == 0'])
+    return list(rows)
+
+
+def measured(read, path):
+    start = time.perf_counter()
+    rows = read(path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    read(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': elapsed, 'peak_mb': peak / 2 ** 20, 'examples': len(rows)}
+
+
+def run(rows=200000):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'examples.csv')
+        create_csv(path, rows)
+        return [dict(measured(read, path), benchmark='example_sources', mode=mode, rows=rows)
+                for mode, read in (('arguments', as_arguments), ('source', from_source))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    for result in run(parser.parse_args().rows):
+        print(f"{result['mode']:<10} {result['examples']:>7} examples {result['seconds']:>7.2f} s "
+              f"{result['peak_mb']:>8.1f} MB peak")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Compare Read Excel without the sheet cache, from the in memory cache and from the on disk cache.
+
+Run from the repository root::
+
+    python benchmarks/excel_cache.py --rows 20000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import RoboPandas
+
+
+def create_workbook(path, rows, columns=8):
+    data = {f'column {col}': [f'value {row}.{col}' for row in range(rows)] for col in range(columns)}
+    RoboPandas.pd.DataFrame(data).to_excel(path, sheet_name='data', index=False)
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run(rows=20000):
+    with tempfile.TemporaryDirectory() as directory:
+        workbook = os.path.join(directory, 'data.xlsx')
+        create_workbook(workbook, rows)
+        read = lambda: RoboPandas.read_excel(workbook, 'data')
+        RoboPandas.set_excel_cache(size=0)
+        uncached = timed(read)
+        RoboPandas.set_excel_cache(size=16, directory=os.path.join(directory, 'cache'))
+        first_read = timed(read)
+        memory_hit = timed(read)
+        RoboPandas._excel_cache.clear()
+        disk_hit = timed(read)
+        RoboPandas.set_excel_cache()
+    return [{'benchmark': 'excel_cache', 'mode': mode, 'rows': rows, 'seconds': seconds}
+            for mode, seconds in (('uncached', uncached), ('first_read', first_read),
+                                  ('memory_hit', memory_hit), ('disk_hit', disk_hit))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    for result in run(parser.parse_args().rows):
+        print(f"{result['mode']:<12} {result['seconds'] * 1000:>10.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Compare replacing variables in Read Excel with per cell converters and with the column wise pass.
+
+Runs inside Robot Framework, as variable replacement needs a running execution.
+Run from the repository root::
+
+    python benchmarks/excel_replace.py --rows 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import RoboPandas
+from robot.libraries.BuiltIn import BuiltIn
+from robot_context import run_in_robot
+
+
+def create_workbook(path, rows):
+    RoboPandas.pd.DataFrame({
+        'id': range(rows),
+        'name': [f'name {row}' for row in range(rows)],
+        'message': [f'${{greeting}} visitor {row % 100}' if row % 10 == 0 else f'welcome {row}' for row in range(rows)],
+        'amount': [row * 0.5 for row in range(rows)],
+    }).to_excel(path, sheet_name='data', index=False)
+
+
+def with_converters(path):
+    # How Read Excel resolved variables before the column wise pass
+    columns = RoboPandas.pd.read_excel(path, sheet_name='data', nrows=0).columns
+    replacer = lambda value: BuiltIn().replace_variables(value) if isinstance(value, str) and '${' in value else value
+    return RoboPandas.pd.read_excel(path, sheet_name='data', converters={col: replacer for col in columns})
+
+
+def column_wise(path):
+    return RoboPandas.read_excel(path, 'data')
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    df = func(*args)
+    return time.perf_counter() - start, df
+
+
+def parse_only(path):
+    return RoboPandas.pd.read_excel(path, sheet_name='data')
+
+
+def benchmark(path):
+    RoboPandas.set_excel_cache(size=0)
+    parse, _ = timed(parse_only, path)
+    converters, expected = timed(with_converters, path)
+    vectorized, df = timed(column_wise, path)
+    # The same values and dtypes as the cells returned by the converters
+    assert df.equals(expected) and df.dtypes.equals(expected.dtypes)
+    RoboPandas.set_excel_cache()
+    column_wise(path)
+    cached_sheet, _ = timed(column_wise, path)
+    return {'parse_only_s': parse, 'converters_s': converters, 'column_wise_s': vectorized,
+            'column_wise_cached_sheet_s': cached_sheet}
+
+
+def run(rows=100000):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'data.xlsx')
+        create_workbook(path, rows)
+        result = run_in_robot(lambda: benchmark(path), variables={'greeting': 'Hello'})
+    return [dict(result, benchmark='excel_replace', rows=rows)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    for result in run(parser.parse_args().rows):
+        print(f"parse only          {result['parse_only_s']:>8.2f} s")
+        print(f"converters          {result['converters_s']:>8.2f} s")
+        print(f"column wise         {result['column_wise_s']:>8.2f} s")
+        print(f"cached sheet        {result['column_wise_cached_sheet_s']:>8.2f} s")
+
+
+if __name__ == '__main__':
+    main()
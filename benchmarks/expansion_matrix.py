@@ -0,0 +1,59 @@
+"""Time Expand Test Examples end to end on generated suites of varying rows, columns, body size and nesting.
+
+Each suite is expanded twice: once timed, and once with the profile library argument to measure the
+memory allocated by the expansion, as tracing allocations slows it down. Run from the repository root::
+
+    python benchmarks/expansion_matrix.py --rows 100 1000 10000 --columns 2 8 --steps 5 50
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from robot_context import example_suite, expand_suite
+
+ROWS = (100, 1000, 10000)
+COLUMNS = (2, 8)
+STEPS = (5, 50)
+NESTING = (False, True)
+
+
+def peak_bytes(rows, columns, steps, nesting):
+    with tempfile.TemporaryDirectory() as directory:
+        profile = os.path.join(directory, 'profile.jsonl')
+        expand_suite(example_suite(rows, columns, steps, nesting, library_args=[f'profile={profile}']))
+        with open(profile, encoding='utf-8') as f:
+            return json.loads(f.readline())['templates'][0]['peak_bytes']
+
+
+def run(rows=ROWS, columns=COLUMNS, steps=STEPS, nesting=NESTING):
+    results = []
+    for row_count, column_count, step_count, nested in itertools.product(rows, columns, steps, nesting):
+        expansion = expand_suite(example_suite(row_count, column_count, step_count, nested))
+        results.append({'benchmark': 'expansion_matrix', 'rows': row_count, 'columns': column_count,
+                        'steps': step_count, 'nesting': nested, 'seconds': expansion['seconds'],
+                        'tests_per_second': expansion['tests'] / expansion['seconds'],
+                        'peak_mb': peak_bytes(row_count, column_count, step_count, nested) / 2 ** 20})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=ROWS)
+    parser.add_argument('--columns', type=int, nargs='+', default=COLUMNS)
+    parser.add_argument('--steps', type=int, nargs='+', default=STEPS)
+    parser.add_argument('--nesting', choices=['no', 'yes', 'both'], default='both')
+    options = parser.parse_args()
+    nesting = {'no': (False,), 'yes': (True,), 'both': NESTING}[options.nesting]
+    for result in run(options.rows, options.columns, options.steps, nesting):
+        print(f"{result['rows']:>7} rows {result['columns']:>3} columns {result['steps']:>4} steps "
+              f"{'nested' if result['nesting'] else 'flat':<6} {result['seconds']:>8.3f} s "
+              f"{result['tests_per_second']:>9.0f} tests/s {result['peak_mb']:>8.1f} MB peak")
+
+
+if __name__ == '__main__':
+    main()
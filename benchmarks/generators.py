@@ -0,0 +1,71 @@
+"""Compare the throughput of the Examples: generator forms with a flattened product passed as arguments.
+
+The flattened product, ``@{{list(itertools.chain(*itertools.product(*lists)))}}`` as in Tests/dynamic.robot,
+is the baseline. Rows are read as Expand Test Examples reads them, without creating tests, and the peak
+memory is traced in a separate run. Run from the repository root::
+
+    python benchmarks/generators.py --dimensions 6 --values 10
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Examples import _example_records
+
+
+def flattened(headers, lists):
+    return headers + ['--'] + list(itertools.chain(*itertools.product(*lists)))
+
+
+def generated(form, where=None, lists=None):
+    return lambda headers, product_lists: (headers + ['--', form] + (lists or product_lists)
+                                           + ([f'where={where}'] if where else []))
+
+
+def read(args_of, headers, lists):
+    col_names, rows = _example_records(args_of(headers, lists))
+    return sum(1 for _ in rows)
+
+
+def measure(args_of, headers, lists):
+    start = time.perf_counter()
+    rows = read(args_of, headers, lists)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    read(args_of, headers, lists)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'generated_rows': rows, 'seconds': seconds, 'rows_per_second': rows / seconds, 'peak_mb': peak / 2 ** 20}
+
+
+def run(dimensions=6, values=10):
+    headers = [f'dimension{dimension}' for dimension in range(dimensions)]
+    lists = [[f'value {dimension}.{value}' for value in range(values)] for dimension in range(dimensions)]
+    # Excludes the combinations that start with the first value of the first two dimensions
+    where = 'not (dimension0 == "value 0.0" and dimension1 == "value 1.0")'
+    # Zips columns as long as the product, so that all forms but pairwise generate about as many rows
+    zipped = [[f'value {dimension}.{row}' for row in range(values ** dimensions)] for dimension in range(dimensions)]
+    forms = (('flattened_product', flattened), ('IN PRODUCT', generated('IN PRODUCT')),
+             ('IN PRODUCT where', generated('IN PRODUCT', where)), ('IN ZIP', generated('IN ZIP', lists=zipped)),
+             ('IN PAIRWISE', generated('IN PAIRWISE')))
+    return [dict(measure(args_of, headers, lists), benchmark='generators', form=form, dimensions=dimensions,
+                 values=values) for form, args_of in forms]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dimensions', type=int, default=6)
+    parser.add_argument('--values', type=int, default=10)
+    options = parser.parse_args()
+    for result in run(options.dimensions, options.values):
+        print(f"{result['form']:<18} {result['generated_rows']:>9} rows {result['seconds']:>7.2f} s "
+              f"{result['rows_per_second']:>11.0f} rows/s  peak {result['peak_mb']:>7.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Measure the import time of the libraries with ``python -X importtime``.
+
+Exits with a non zero status when a library imports one of the heavy
+dependencies at load time, or when ``--max-ms`` is given and exceeded,
+so that CI can gate on it. Run from the repository root::
+
+    python benchmarks/import_time.py --max-ms 500
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIBRARIES = ('Examples', 'RoboPandas')
+HEAVY_MODULES = ('pandas', 'numpy', 'sqlalchemy', 'openpyxl')
+
+
+def import_times(module):
+    """Return {imported module: cumulative microseconds} for importing module in a fresh interpreter."""
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                             cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def run(libraries=LIBRARIES, repeat=5):
+    results = []
+    for library in libraries:
+        runs = [import_times(library) for _ in range(repeat)]
+        results.append({'benchmark': 'import_time', 'library': library,
+                        'import_ms': min(times[library] for times in runs) / 1000,
+                        'heavy_modules': sorted(name for name in runs[0] if name in HEAVY_MODULES)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-ms', type=float, help='fail when a library takes longer to import')
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per library (best is kept)')
+    options = parser.parse_args()
+    failed = False
+    for result in run(repeat=options.repeat):
+        status = 'ok'
+        if result['heavy_modules']:
+            status = 'imports ' + ', '.join(result['heavy_modules'])
+        elif options.max_ms and result['import_ms'] > options.max_ms:
+            status = f'slower than {options.max_ms:g} ms'
+        failed = failed or status != 'ok'
+        print(f"{result['library']:<12} {result['import_ms']:>8.1f} ms  {status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
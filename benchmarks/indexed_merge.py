@@ -0,0 +1,65 @@
+"""Compare repeated merges of small dataframes with a large reference dataframe and with a lookup index on it.
+
+Run from the repository root::
+
+    python benchmarks/indexed_merge.py --rows 1000000 --small-rows 100 --merges 50
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import RoboPandas
+
+
+def frames(rows, small_rows, merges):
+    pd, numpy = RoboPandas.pd, RoboPandas.numpy
+    reference = pd.DataFrame({
+        'key': [f'key {row}' for row in range(rows)],
+        'region': [f'region {row % 50}' for row in range(rows)],
+        'amount': numpy.arange(rows) * 0.5,
+    })
+    rng = numpy.random.default_rng(1)
+    small = [pd.DataFrame({'key': [f'key {row}' for row in rng.integers(0, rows * 1.1, small_rows)],
+                           'quantity': rng.integers(1, 10, small_rows)}) for _ in range(merges)]
+    return reference, small
+
+
+def timed(merge, small):
+    start = time.perf_counter()
+    merged = [merge(df) for df in small]
+    return (time.perf_counter() - start) / len(small), merged
+
+
+def run(rows=1000000, small_rows=100, merges=50, merge_type='inner'):
+    reference, small = frames(rows, small_rows, merges)
+    merge = RoboPandas.merge_dataframes_with_same_key_names
+    start = time.perf_counter()
+    index = RoboPandas.create_lookup_index(reference, 'key')
+    RoboPandas.lookup_rows(index, 'key 0')
+    build = time.perf_counter() - start
+    plain, expected = timed(lambda df: merge(df, reference, 'key', merge_type), small)
+    indexed, merged = timed(lambda df: merge(df, index, 'key', merge_type), small)
+    assert all(left.equals(right) for left, right in zip(merged, expected))
+    common = {'benchmark': 'indexed_merge', 'rows': rows, 'small_rows': small_rows, 'merge_type': merge_type}
+    return [dict(common, mode='dataframe', per_merge_ms=plain * 1000),
+            dict(common, mode='lookup_index', per_merge_ms=indexed * 1000, build_s=build,
+                 speedup=plain / indexed)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--small-rows', type=int, default=100)
+    parser.add_argument('--merges', type=int, default=50)
+    parser.add_argument('--merge-type', default='inner', choices=('inner', 'left'))
+    options = parser.parse_args()
+    for result in run(options.rows, options.small_rows, options.merges, options.merge_type):
+        extra = f" ({result['speedup']:.0f}x, index built in {result['build_s']:.2f} s)" if 'speedup' in result else ''
+        print(f"{result['mode']:<13} {result['per_merge_ms']:>9.2f} ms per merge{extra}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Compare the peak memory of running a large Examples: table with and without lazy expansion.
+
+Each mode runs in its own process, which reports its own peak resident set size.
+Run from the repository root::
+
+    python benchmarks/lazy_expansion.py --rows 20000
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from robot_context import example_suite
+
+
+def reset_peak_rss():
+    # On Linux ru_maxrss is kept across exec, so a child would report the peak of the process that
+    # started it, e.g. the benchmark runner. Writing 5 to clear_refs resets the peak, VmHWM, instead.
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            return next(int(line.split()[1]) for line in f if line.startswith('VmHWM:')) / 1024
+    except (OSError, StopIteration):
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+
+def run_suite(rows, steps, lazy):
+    suite = example_suite(rows, steps=steps, library_args=[f'lazy={lazy}'])
+    suite.setup.config(name='Expand Test Examples')
+    start = time.perf_counter()
+    result = suite.run(output=None, log=None, report=None, stdout=io.StringIO(), stderr=io.StringIO())
+    elapsed = time.perf_counter() - start
+    return {'tests': result.statistics.total.total, 'seconds': elapsed, 'peak_rss_mb': peak_rss_mb()}
+
+
+def run(rows=20000, steps=10):
+    results = []
+    for lazy in (False, True):
+        output = subprocess.run([sys.executable, __file__, '--child', '--rows', str(rows), '--steps', str(steps),
+                                 '--lazy', str(lazy)], check=True, capture_output=True, text=True).stdout
+        results.append(dict(json.loads(output), benchmark='lazy_expansion', lazy=lazy, rows=rows, steps=steps))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--steps', type=int, default=10)
+    parser.add_argument('--lazy', default='False')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    options = parser.parse_args()
+    if options.child:
+        reset_peak_rss()
+        print(json.dumps(run_suite(options.rows, options.steps, options.lazy)))
+        return
+    for result in run(options.rows, options.steps):
+        print(f"lazy={result['lazy']!s:<6} {result['tests']:>7} tests {result['seconds']:>8.1f} s "
+              f"{result['peak_rss_mb']:>8.1f} MB peak RSS")
+
+
+if __name__ == '__main__':
+    main()
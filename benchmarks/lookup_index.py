@@ -0,0 +1,68 @@
+"""Compare repeated Query Dataframe calls with lookups through a lookup index.
+
+Run from the repository root::
+
+    python benchmarks/lookup_index.py --rows 1000000 --lookups 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import RoboPandas
+
+
+def reference(rows):
+    return RoboPandas.pd.DataFrame({
+        'id': [f'id {row}' for row in range(rows)],
+        'group': [f'group {row % 1000}' for row in range(rows)],
+        'amount': RoboPandas.numpy.arange(rows) % 5000,
+    })
+
+
+def timed(func, keys):
+    start = time.perf_counter()
+    for key in keys:
+        func(key)
+    return (time.perf_counter() - start) / len(keys)
+
+
+def run(rows=1000000, lookups=1000):
+    df = reference(rows)
+    keys = [f'id {row * 7919 % rows}' for row in range(lookups)]
+    start = time.perf_counter()
+    index = RoboPandas.create_lookup_index(df, 'id')
+    RoboPandas.lookup_rows(index, keys[0])
+    build = time.perf_counter() - start
+    amounts = RoboPandas.create_lookup_index(df, 'amount')
+    results = [
+        {'benchmark': 'lookup_index', 'predicate': 'equal', 'mode': 'query', 'rows': rows,
+         'per_lookup_ms': timed(lambda key: RoboPandas.query_dataframe(df, f'id == "{key}"'), keys[:100]) * 1000},
+        {'benchmark': 'lookup_index', 'predicate': 'equal', 'mode': 'index', 'rows': rows, 'build_s': build,
+         'per_lookup_ms': timed(lambda key: RoboPandas.lookup_rows(index, key), keys) * 1000},
+        {'benchmark': 'lookup_index', 'predicate': 'equal', 'mode': 'index_row', 'rows': rows,
+         'per_lookup_ms': timed(lambda key: RoboPandas.lookup_row(index, key), keys) * 1000},
+        {'benchmark': 'lookup_index', 'predicate': 'range', 'mode': 'query', 'rows': rows,
+         'per_lookup_ms': timed(lambda low: RoboPandas.query_dataframe(df, f'amount >= {low} and amount < {low + 5}'),
+                                range(0, 5000, 50)) * 1000},
+        {'benchmark': 'lookup_index', 'predicate': 'range', 'mode': 'index', 'rows': rows,
+         'per_lookup_ms': timed(lambda low: RoboPandas.lookup_range(amounts, low, low + 5, include_high=False),
+                                range(0, 5000, 5)) * 1000},
+    ]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--lookups', type=int, default=1000)
+    options = parser.parse_args()
+    for result in run(options.rows, options.lookups):
+        build = f" (built in {result['build_s']:.2f} s)" if 'build_s' in result else ''
+        print(f"{result['predicate']:<6} {result['mode']:<10} {result['per_lookup_ms']:>9.3f} ms per lookup{build}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Time expanding an Examples: table serially and with a pool of worker processes.
+
+Also checks that every worker count expands exactly the same tests as the serial
+expansion. Run from the repository root::
+
+    python benchmarks/parallel_expansion.py --rows 20000 --steps 20
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from robot_context import example_suite, expand_suite
+
+WORKERS = (0, 2, 4, 8)
+
+
+def run(rows=20000, steps=20, workers=WORKERS, nesting=False):
+    results = []
+    serial = None
+    for count in workers:
+        expansion = expand_suite(example_suite(rows, steps=steps, nesting=nesting,
+                                               library_args=[f'workers={count}']))
+        serial = serial or expansion['expanded']
+        assert expansion['expanded'] == serial, f'{count} workers expanded different tests'
+        results.append({'benchmark': 'parallel_expansion', 'workers': count, 'rows': rows, 'steps': steps,
+                        'seconds': expansion['seconds'],
+                        'tests_per_second': expansion['tests'] / expansion['seconds']})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--steps', type=int, default=20)
+    parser.add_argument('--nesting', action='store_true', help='put steps in FOR loops with an IF')
+    options = parser.parse_args()
+    print(f'{os.cpu_count()} CPUs')
+    for result in run(options.rows, options.steps, nesting=options.nesting):
+        print(f"{result['workers']:>3} workers {result['seconds']:>8.2f} s {result['tests_per_second']:>10.0f} tests/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""List the slowest Examples: tests from the files written with the profile argument of the Examples library.
+
+Run from the repository root::
+
+    python benchmarks/profile_report.py output/examples_profile.jsonl --top 20
+"""
+import argparse
+import json
+
+
+def read_templates(paths):
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield from json.loads(line)['templates']
+
+
+def run(paths, top=20, sort='total'):
+    templates = sorted(read_templates(paths), key=lambda template: template['seconds'].get(sort, 0), reverse=True)
+    return [dict(template, benchmark='profile_report') for template in templates[:top]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--sort', default='total', help='the phase to sort by, e.g. total, expand or read')
+    options = parser.parse_args()
+    for template in run(options.paths, options.top, options.sort):
+        print(f"{template['seconds'][options.sort]:>8.3f} s {template['tests'] or 0:>7} tests "
+              f"{template['peak_bytes'] / 2 ** 20:>8.1f} MB peak  {template['source']}:{template['lineno']}")
+
+
+if __name__ == '__main__':
+    main()
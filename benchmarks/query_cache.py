@@ -0,0 +1,69 @@
+"""Compare the per call latency of Query Dataframe with DataFrame.query, which it used before queries were compiled.
+
+Run from the repository root::
+
+    python benchmarks/query_cache.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import RoboPandas
+
+QUERIES = {
+    'equal': 'A == "value 7" and B == "value 3"',
+    'compare': 'C < 700 or C > 9000',
+    'membership': 'A in ("value 15", "value 22", "value 18")',
+    'not_null': 'D == D',
+}
+
+
+def reference(rows):
+    numpy = RoboPandas.numpy
+    return RoboPandas.pd.DataFrame({
+        'A': [f'value {row % 100}' for row in range(rows)],
+        'B': [f'value {row % 7}' for row in range(rows)],
+        'C': numpy.arange(rows) % 10000,
+        'D': numpy.where(numpy.arange(rows) % 3, 1.5, numpy.nan),
+    })
+
+
+def per_call(func, repeat):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def run(rows=1000000, repeat=10):
+    df = reference(rows)
+    results = []
+    for name, query in QUERIES.items():
+        expected = df.query(query)
+        assert RoboPandas.query_dataframe(df, query).equals(expected)
+        result = {'benchmark': 'query_cache', 'query': name, 'rows': rows,
+                  'dataframe_query_ms': per_call(lambda: df.query(query), repeat) * 1000,
+                  'query_dataframe_ms': per_call(lambda: RoboPandas.query_dataframe(df, query), repeat) * 1000}
+        result['speedup'] = result['dataframe_query_ms'] / result['query_dataframe_ms']
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=10)
+    options = parser.parse_args()
+    print(f"{'query':<11} {'DataFrame.query ms':>19} {'Query Dataframe ms':>19} {'speedup':>8}")
+    for result in run(options.rows, options.repeat):
+        print(f"{result['query']:<11} {result['dataframe_query_ms']:>19.2f} "
+              f"{result['query_dataframe_ms']:>19.2f} {result['speedup']:>7.1f}x")
+    print(RoboPandas.get_query_cache_statistics())
+
+
+if __name__ == '__main__':
+    main()
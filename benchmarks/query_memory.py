@@ -0,0 +1,75 @@
+"""Compare peak memory of reading a large SQLite table at once and in chunks.
+
+Peak memory is traced with tracemalloc, which includes the numpy buffers of the
+dataframes. Run from the repository root::
+
+    python benchmarks/query_memory.py --rows 1000000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import RoboPandas
+from Examples import _example_records
+
+QUERY = 'select * from reference'
+
+
+def create_database(path, rows):
+    with sqlite3.connect(path) as db:
+        db.execute('drop table if exists reference')
+        db.execute('create table reference (id integer primary key, code text, label text, amount real)')
+        db.executemany('insert into reference values (?, ?, ?, ?)',
+                       ((row, f'C{row % 5000:05}', f'label for row {row}', row * 0.5) for row in range(rows)))
+
+
+def full(db_url, chunksize):
+    return len(RoboPandas.create_dataframe_from_query(QUERY, db_url))
+
+
+def chunked(db_url, chunksize):
+    return sum(len(chunk) for chunk in RoboPandas.create_dataframe_from_query(QUERY, db_url, chunksize=chunksize))
+
+
+def examples_rows(db_url, chunksize):
+    _, rows = _example_records([RoboPandas.create_dataframe_from_query(QUERY, db_url, chunksize=chunksize)])
+    return sum(1 for _ in rows)
+
+
+def run(rows=1000000, chunksize=10000):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'reference.db')
+        create_database(path, rows)
+        db_url = f'sqlite:///{path}'
+        for name, func in (('full', full), ('chunked', chunked), ('examples_rows', examples_rows)):
+            tracemalloc.start()
+            start = time.perf_counter()
+            count = func(db_url, chunksize)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert count == rows
+            results.append({'benchmark': 'query_memory', 'mode': name, 'rows': rows, 'chunksize': chunksize,
+                            'peak_mb': peak / 2 ** 20, 'seconds': elapsed})
+        RoboPandas.disconnect_from_database()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--chunksize', type=int, default=10000)
+    options = parser.parse_args()
+    for result in run(options.rows, options.chunksize):
+        print(f"{result['mode']:<14} peak {result['peak_mb']:>9.1f} MB  {result['seconds']:>7.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Compare building Examples: rows natively with the create_dataframe round trip.
+
+Run from the repository root::
+
+    python benchmarks/records.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Examples import _example_records
+from RoboPandas import create_dataframe
+
+SIZES = (100, 1000, 10000, 100000)
+
+
+def example_args(rows, columns=4):
+    headers = [f'column {col}' for col in range(columns)]
+    data = [f'value {row}.{col}' for row in range(rows) for col in range(columns)]
+    return headers + ['--'] + data
+
+
+def with_dataframe(args):
+    return create_dataframe(*args).to_dict('records')
+
+
+def with_records(args):
+    col_names, rows = _example_records(args)
+    return [dict(zip(col_names, row)) for row in rows]
+
+
+def run(sizes=SIZES, columns=4):
+    results = []
+    for rows in sizes:
+        args = example_args(rows, columns)
+        number = max(1, 100000 // rows)
+        result = {'benchmark': 'records', 'rows': rows, 'columns': columns}
+        for name, func in (('dataframe', with_dataframe), ('records', with_records)):
+            result[f'{name}_s'] = min(timeit.repeat(lambda: func(args), number=number, repeat=3)) / number
+        result['speedup'] = result['dataframe_s'] / result['records_s']
+        results.append(result)
+    return results
+
+
+def main():
+    print(f"{'rows':>8} {'dataframe ms':>14} {'records ms':>12} {'speedup':>8}")
+    for result in run():
+        print(f"{result['rows']:>8} {result['dataframe_s'] * 1000:>14.3f} "
+              f"{result['records_s'] * 1000:>12.3f} {result['speedup']:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Run benchmark code inside a Robot Framework execution, for code that needs BuiltIn or the variable scopes.
+
+This module is also the library providing the keywords that call the code and time expansions.
+"""
+import io
+import time
+
+from robot.libraries.BuiltIn import BuiltIn
+from robot.running import TestSuite
+
+_calls = []
+
+
+def run_benchmark_function():
+    func, results = _calls[-1]
+    results.append(func())
+
+
+def run_in_robot(func, variables=None):
+    """Calls func in a test of a generated suite and returns its result.
+
+    variables are created as suite variables, e.g. {'greeting': 'Hello'}.
+    """
+    results = []
+    _calls.append((func, results))
+    try:
+        suite = TestSuite(name='Benchmark')
+        suite.resource.imports.library(__name__)
+        for name, value in (variables or {}).items():
+            suite.resource.variables.create(f'${{{name}}}', [value])
+        suite.tests.create('Benchmark').body.create_keyword('Run Benchmark Function')
+        result = suite.run(output=None, log=None, report=None, stdout=io.StringIO(), stderr=io.StringIO())
+        if result.return_code:
+            raise RuntimeError(result.suite.tests[0].message)
+    finally:
+        _calls.pop()
+    return results[0]
+
+
+_expansions = []
+
+
+def time_expansion():
+    """Runs Expand Test Examples, records how long it took and removes the expanded tests so that none run."""
+    examples = BuiltIn().get_library_instance('Examples')
+    start = time.perf_counter()
+    examples.expand_test_examples()
+    elapsed = time.perf_counter() - start
+    suite = examples.current_suite
+    _expansions.append({'seconds': elapsed, 'tests': len(suite.tests), 'expanded': describe(suite.tests)})
+    suite.tests = []
+
+
+def describe(items):
+    """A comparable description of test cases or body items, e.g. to check that expansions are identical."""
+    return [(item.type if hasattr(item, 'type') else 'TEST',
+             *(str(getattr(item, attr, '')) for attr in ('name', 'args', 'assign', 'tags', 'values', 'condition')),
+             describe(getattr(item, 'body', ())))
+            for item in items]
+
+
+def example_suite(rows, columns=4, steps=10, nesting=False, library_args=()):
+    """Generates a suite with an Examples: test of rows x columns values and a body of steps keywords.
+
+    With nesting, every other step is in a FOR loop with an IF in it.
+    The suite setup times the expansion, see expand_suite.
+    """
+    headers = [f'column {col}' for col in range(columns)]
+    suite = TestSuite(name='Expansion')
+    suite.resource.imports.library('Examples', args=['autoexpand=False', *library_args])
+    suite.resource.imports.library(__name__)
+    suite.setup.config(name='Time Expansion')
+    test = suite.tests.create('Example ${column 0}', tags=['${column 1}'])
+    for step in range(steps):
+        args = [f'step {step} ${{{headers[step % columns]}}}', 'console=False']
+        if nesting and step % 2:
+            loop = test.body.create_for(variables=['${i}'], flavor='IN RANGE', values=['2'])
+            branch = loop.body.create_if().body.create_branch(condition=f"'${{{headers[0]}}}' != ''")
+            branch.body.create_keyword('Log', args=args)
+        else:
+            test.body.create_keyword('Log', args=args)
+    data = [f'value {row}.{col}' for row in range(rows) for col in range(columns)]
+    test.body.create_keyword('Examples:', args=headers + ['--'] + data)
+    return suite
+
+
+def expand_suite(suite):
+    """Runs a suite from example_suite and returns {'seconds': ..., 'tests': ..., 'expanded': ...}."""
+    _expansions.clear()
+    suite.run(output=None, log=None, report=None, stdout=io.StringIO(), stderr=io.StringIO())
+    return _expansions[-1]
@@ -0,0 +1,144 @@
+"""Run the benchmarks, store the results as JSON and compare them with an earlier run.
+
+All benchmarks run offline: suites, workbooks and SQLite databases are generated in temporary
+directories. --quick uses smaller sizes, e.g. for a check before a release on a laptop.
+Run from the repository root::
+
+    python benchmarks/run_benchmarks.py --quick --output results.json
+    python benchmarks/run_benchmarks.py --quick --output new.json --compare results.json --threshold 0.25
+
+With --compare, the metrics of each result are compared with the result of the same benchmark and
+parameters in the earlier run, and the exit status is non zero when one is worse by more than threshold.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name: (quick arguments, full arguments) of the run function of the module of that name
+BENCHMARKS = {
+    'import_time': ({'repeat': 3}, {}),
+    'expansion_matrix': ({'rows': (100, 1000), 'columns': (2, 8), 'steps': (5, 20)}, {}),
+    'template_expansion': ({'rows': 1000, 'steps': 20, 'baseline_rows': 20}, {}),
+    'records': ({'sizes': (1000, 10000)}, {}),
+    'sampling': ({'columns': 4}, {}),
+    'example_sources': ({'rows': 20000}, {}),
+    'excel_cache': ({'rows': 2000}, {}),
+    'excel_replace': ({'rows': 5000}, {}),
+    'db_pool': ({'queries': 100}, {}),
+    'query_memory': ({'rows': 100000}, {}),
+    'lookup_index': ({'rows': 100000, 'lookups': 200}, {}),
+    'query_cache': ({'rows': 100000}, {}),
+    'typed_storage': ({'rows': 10000}, {}),
+    'indexed_merge': ({'rows': 100000, 'merges': 10}, {}),
+    'chain_memory': ({'rows': 100000}, {}),
+    'to_dict': ({'rows': 20000}, {}),
+    'scope_overlay': ({'variables': 2000, 'tests': 50}, {}),
+    'generators': ({'dimensions': 4, 'values': 6}, {}),
+    'parallel_expansion': ({'rows': 2000, 'steps': 10, 'workers': (0, 2)}, {}),
+    'lazy_expansion': ({'rows': 1000}, {}),
+    'sharding': ({'rows': 1000, 'shard_counts': (1, 2)}, {}),
+}
+# Metrics where a lower value is better, by name or by suffix. Other numbers identify the result.
+LOWER_IS_BETTER = ('seconds', 'import_ms', 'per_query_ms', 'per_lookup_ms', 'per_merge_ms', 'peak_mb', 'peak_rss_mb', '_s', '_ms', '_mb')
+HIGHER_IS_BETTER = ('tests_per_second', 'rows_per_second', 'speedup')
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    versions = {}
+    for module in ('robot', 'pandas', 'numpy', 'sqlalchemy', 'openpyxl'):
+        try:
+            versions[module] = importlib.import_module(module).__version__
+        except (ImportError, AttributeError):
+            versions[module] = None
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'commit': commit, 'versions': versions, 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def run(names=tuple(BENCHMARKS), quick=False):
+    results = []
+    for name in names:
+        quick_args, full_args = BENCHMARKS[name]
+        print(f'Running {name}', file=sys.stderr)
+        start = time.perf_counter()
+        results.extend(importlib.import_module(name).run(**(quick_args if quick else full_args)))
+        print(f'  done in {time.perf_counter() - start:.1f} s', file=sys.stderr)
+    return results
+
+
+def _direction(metric):
+    if metric in HIGHER_IS_BETTER:
+        return 1
+    if metric in LOWER_IS_BETTER or metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def _identity(result):
+    return tuple(sorted((key, repr(value)) for key, value in result.items()
+                        if not _direction(key) and not isinstance(value, (float, list, dict))))
+
+
+def compare(results, baseline, threshold=0.25):
+    """Returns (benchmark, parameters, metric, before, after, change) for each metric worse than threshold.
+
+    change is the relative change, positive when the metric got worse.
+    """
+    earlier = {_identity(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = earlier.get(_identity(result))
+        if not before:
+            continue
+        for metric, value in result.items():
+            direction = _direction(metric)
+            if not direction or not isinstance(value, (int, float)) or not before.get(metric):
+                continue
+            change = (before[metric] - value) / before[metric] * direction
+            if change > threshold:
+                parameters = {key: value for key, value in result.items()
+                              if not _direction(key) and key != 'benchmark' and not isinstance(value, (list, dict))}
+                regressions.append((result['benchmark'], parameters, metric, before[metric], value, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('names', nargs='*', choices=[[]] + list(BENCHMARKS), metavar='benchmark',
+                        help=f"benchmarks to run, by default all of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--quick', action='store_true', help='use smaller sizes')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON file of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative change of a metric that counts as a regression (default 0.25)')
+    options = parser.parse_args()
+    results = run(options.names or tuple(BENCHMARKS), options.quick)
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'quick': options.quick, 'results': results}, f, indent=1)
+    for result in results:
+        print(json.dumps(result))
+    if options.compare:
+        with open(options.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, options.threshold)
+        for benchmark, parameters, metric, before, after, change in regressions:
+            print(f'REGRESSION {benchmark} {parameters}: {metric} {before:.4g} -> {after:.4g} ({change:+.0%})')
+        print(f'{len(regressions)} regressions over {options.threshold:.0%}')
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
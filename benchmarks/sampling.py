@@ -0,0 +1,69 @@
+"""Compare choosing examples from a large streamed table with random.sample, reservoir sampling,
+stratified and pairwise selection.
+
+The table is the product of columns x values rows, generated as it is read, like a streamed query.
+Run from the repository root::
+
+    python benchmarks/sampling.py --columns 5 --values 10 --count 300
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Examples
+
+
+def table(columns, values):
+    return itertools.product(*[[f'value {value}' for value in range(values)]] * columns)
+
+
+def random_sample(rows, count):
+    # How random examples were chosen before reservoir sampling
+    rows = list(rows)
+    return random.Random(1).sample(rows, count)
+
+
+def measured(select, make_rows):
+    # Timed and traced separately, as tracing slows down the selection
+    start = time.perf_counter()
+    chosen = select(make_rows())
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    select(make_rows())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': elapsed, 'peak_mb': peak / 2 ** 20, 'chosen': len(chosen)}
+
+
+def run(columns=5, values=10, count=300):
+    everything = list(range(columns))
+    selections = {
+        'random_sample': lambda rows: random_sample(rows, count),
+        'reservoir': lambda rows: Examples._sample_rows(rows, count, random.Random(1)),
+        'stratified': lambda rows: Examples._stratified_rows(rows, [0, 1], count, random.Random(1)),
+        'pairwise': lambda rows: Examples._pairwise_rows(rows, everything),
+    }
+    return [dict(measured(select, lambda: table(columns, values)), benchmark='sampling', mode=mode,
+                 rows=values ** columns, columns=columns)
+            for mode, select in selections.items()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--columns', type=int, default=5)
+    parser.add_argument('--values', type=int, default=10)
+    parser.add_argument('--count', type=int, default=300)
+    options = parser.parse_args()
+    for result in run(options.columns, options.values, options.count):
+        print(f"{result['mode']:<14} {result['rows']:>8} rows {result['chosen']:>6} chosen "
+              f"{result['seconds']:>7.2f} s {result['peak_mb']:>8.1f} MB peak")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Compare expanding with the example values over the current scope and with a copy of the scope for each test.
+
+The copied scope, with Examples: arguments resolved for every test, is how tests were expanded before and
+is kept here as the baseline. The generated suite has many global variables, a large global dictionary
+and Examples: tests with identical arguments referring to it. Run from the repository root::
+
+    python benchmarks/scope_overlay.py --variables 10000 --dict-entries 10000 --tests 200
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Examples
+from robot.libraries.BuiltIn import BuiltIn
+from robot.running import TestSuite
+from robot.running.context import EXECUTION_CONTEXTS
+from robot_context import expand_suite
+
+
+def copied_scope(self):
+    variables = EXECUTION_CONTEXTS.current.variables
+    outside = variables.current
+    variables.start_keyword()
+    scope = variables.current
+    scope.update(outside)
+    variables.end_keyword()
+    return scope
+
+
+def resolved_every_time(self, args):
+    return BuiltIn()._variables.replace_list(args)
+
+
+def scope_suite(variables, dict_entries, tests, rows=5):
+    suite = TestSuite(name='Scope')
+    suite.resource.imports.library('Examples', args=['autoexpand=False'])
+    suite.resource.imports.library('robot_context')
+    suite.setup.config(name='Time Expansion')
+    for number in range(variables):
+        suite.resource.variables.create(f'${{global {number}}}', [f'value {number}'])
+    suite.resource.variables.create('&{big}', [f'key {entry}=value {entry}' for entry in range(dict_entries)])
+    data = [value for row in range(rows) for value in (f'name {row}', f'${{big}}[key {row}]')]
+    for number in range(tests):
+        test = suite.tests.create(f'Test {number} ${{name}}')
+        test.body.create_keyword('Log', args=['${name} ${value}'])
+        test.body.create_keyword('Examples:', args=['name', 'value', '--'] + data)
+    return suite
+
+
+def expand(suite, baseline):
+    library = Examples.Examples
+    overlay, memoized = library._example_scope, library._resolve_examples_args
+    if baseline:
+        library._example_scope, library._resolve_examples_args = copied_scope, resolved_every_time
+    try:
+        return expand_suite(suite)
+    finally:
+        library._example_scope, library._resolve_examples_args = overlay, memoized
+
+
+def run(variables=10000, dict_entries=10000, tests=200):
+    results = []
+    expanded = []
+    for mode, baseline in (('copied_scope', True), ('overlay', False)):
+        expansion = expand(scope_suite(variables, dict_entries, tests), baseline)
+        expanded.append(expansion['expanded'])
+        results.append({'benchmark': 'scope_overlay', 'mode': mode, 'variables': variables,
+                        'dict_entries': dict_entries, 'tests': tests, 'seconds': expansion['seconds'],
+                        'tests_per_second': expansion['tests'] / expansion['seconds']})
+    assert expanded[0] == expanded[1]
+    results[-1]['speedup'] = results[0]['seconds'] / results[-1]['seconds']
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--variables', type=int, default=10000)
+    parser.add_argument('--dict-entries', type=int, default=10000)
+    parser.add_argument('--tests', type=int, default=200)
+    options = parser.parse_args()
+    for result in run(options.variables, options.dict_entries, options.tests):
+        speedup = f" ({result['speedup']:.1f}x)" if 'speedup' in result else ''
+        print(f"{result['mode']:<13} {result['seconds']:>8.3f} s {result['tests_per_second']:>9.1f} tests/s{speedup}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Compare running a large Examples: table in one process and split over shards.
+
+Each shard runs in its own process. By default the shards run one after another and the slowest one
+is reported as the wall-clock time with a CPU per shard; with --concurrent they run at the same time.
+Run from the repository root::
+
+    python benchmarks/sharding.py --rows 8000 --shards 1 2 4 8
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from robot_context import example_suite
+
+
+def run_shard(rows, steps, shard):
+    start = time.perf_counter()
+    suite = example_suite(rows, steps=steps, library_args=[f'shard={shard}'])
+    suite.setup.config(name='Expand Test Examples')
+    result = suite.run(output=None, log=None, report=None, stdout=io.StringIO(), stderr=io.StringIO())
+    return {'tests': result.statistics.total.total, 'seconds': time.perf_counter() - start}
+
+
+def shard_command(rows, steps, shard):
+    return [sys.executable, __file__, '--child', shard, '--rows', str(rows), '--steps', str(steps)]
+
+
+def run(rows=8000, steps=5, shard_counts=(1, 2, 4, 8), concurrent=False):
+    results = []
+    for count in shard_counts:
+        commands = [shard_command(rows, steps, f'{index}/{count}') for index in range(1, count + 1)]
+        start = time.perf_counter()
+        if concurrent:
+            processes = [subprocess.Popen(command, stdout=subprocess.PIPE, text=True) for command in commands]
+            outputs = [process.communicate()[0] for process in processes]
+        else:
+            outputs = [subprocess.run(command, check=True, capture_output=True, text=True).stdout
+                       for command in commands]
+        elapsed = time.perf_counter() - start
+        shards = [json.loads(output) for output in outputs]
+        assert sum(shard['tests'] for shard in shards) == rows
+        results.append({'benchmark': 'sharding', 'rows': rows, 'shards': count, 'concurrent': concurrent,
+                        'wall_seconds': elapsed if concurrent else max(shard['seconds'] for shard in shards),
+                        'total_seconds': sum(shard['seconds'] for shard in shards),
+                        'tests_per_shard': [shard['tests'] for shard in shards]})
+    single = results[0]['total_seconds']
+    for result in results:
+        result['speedup'] = single / result['wall_seconds']
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=8000)
+    parser.add_argument('--steps', type=int, default=5)
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--concurrent', action='store_true')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    options = parser.parse_args()
+    if options.child:
+        print(json.dumps(run_shard(options.rows, options.steps, options.child)))
+        return
+    for result in run(options.rows, options.steps, options.shards, options.concurrent):
+        print(f"{result['shards']:>2} shards {result['wall_seconds']:>7.1f} s wall {result['speedup']:>5.1f}x "
+              f"{result['total_seconds']:>7.1f} s total, tests per shard "
+              f"{min(result['tests_per_shard'])}-{max(result['tests_per_shard'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Compare expanding with a compiled test template and with walking and copying the body for every row.
+
+The per row walk is the expansion as it was before templates were compiled, kept here as the baseline.
+It deep copies every FOR and IF, which is slow enough that it is measured on fewer rows. Both expansions
+are checked to give the same tests. Run from the repository root::
+
+    python benchmarks/template_expansion.py --rows 10000 --steps 50 --baseline-rows 200
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Examples
+from robot_context import example_suite, expand_suite
+
+
+class PerRowExpander(Examples._ExampleExpander):
+
+    def expand(self, col_names, examples):
+        tests = []
+        for example in examples:
+            self.store.data.update(zip(col_names, example))
+            filled_tc = type(self.example_tc)(self.variables.replace_scalar(self.example_tc.name, ignore_errors=True))
+            filled_tc.setup = self.example_tc.setup
+            filled_tc.teardown = self.example_tc.teardown
+            filled_tc.tags = self.replace_list(self.example_tc.tags)
+            self._walk_body(self.example_tc.body, filled_tc.body)
+            self.first_tc = False
+            tests.append(filled_tc)
+        return tests
+
+    def _walk_body(self, body, target):
+        for kw in body:
+            self.kw = kw
+            if kw.type == 'KEYWORD':
+                if kw.name.lower() == 'examples:':
+                    continue
+                target.create_keyword(self.variables.replace_scalar(kw.name, ignore_errors=True),
+                                      args=self.replace_list(kw.args), assign=kw.assign,
+                                      tags=self.replace_list(kw.tags), timeout=kw.timeout, lineno=kw.lineno)
+            else:
+                new_kw = kw.deepcopy()
+                new_kw.body = None
+                if hasattr(new_kw, 'values'):
+                    new_kw.values = self.replace_list(kw.values)
+                if hasattr(new_kw, 'condition'):
+                    new_kw.condition = self.variables.replace_scalar(kw.condition, ignore_errors=True)
+                self._walk_body(kw.body, new_kw.body)
+                target.append(new_kw)
+
+
+def expand(rows, steps, expander):
+    compiled = Examples._ExampleExpander
+    Examples._ExampleExpander = expander
+    try:
+        return expand_suite(example_suite(rows, steps=steps, nesting=True))
+    finally:
+        Examples._ExampleExpander = compiled
+
+
+def run(rows=10000, steps=50, baseline_rows=200):
+    baseline = expand(baseline_rows, steps, PerRowExpander)
+    assert expand(baseline_rows, steps, Examples._ExampleExpander)['expanded'] == baseline['expanded']
+    results = [{'benchmark': 'template_expansion', 'mode': 'per_row', 'rows': baseline_rows, 'steps': steps,
+                'seconds': baseline['seconds'], 'tests_per_second': baseline['tests'] / baseline['seconds']}]
+    compiled = expand(rows, steps, Examples._ExampleExpander)
+    results.append({'benchmark': 'template_expansion', 'mode': 'compiled', 'rows': rows, 'steps': steps,
+                    'seconds': compiled['seconds'], 'tests_per_second': compiled['tests'] / compiled['seconds']})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--steps', type=int, default=50)
+    parser.add_argument('--baseline-rows', type=int, default=200)
+    options = parser.parse_args()
+    for result in run(options.rows, options.steps, options.baseline_rows):
+        print(f"{result['mode']:<9} {result['rows']:>7} rows {result['seconds']:>8.2f} s "
+              f"{result['tests_per_second']:>9.1f} tests/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Compare building dictionaries with to_dict and set_index directly from the rows and through a dataframe.
+
+The dataframe path is how Create Dataframe and Read Excel built them before: copy the index column,
+drop duplicates, set the index and call DataFrame.to_dict. Run from the repository root::
+
+    python benchmarks/to_dict.py --rows 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import RoboPandas
+from records import example_args
+
+ORIENTATIONS = ('index', 'records', 'list', 'dict')
+
+
+def through_dataframe(df, set_index, to_dict):
+    df['_idx_'] = df[set_index]
+    df.drop_duplicates(subset=['_idx_'], inplace=True)
+    return df.set_index('_idx_').to_dict(to_dict)
+
+
+def timed(func, repeat=3):
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        seconds.append(time.perf_counter() - start)
+    return min(seconds), result
+
+
+def run(rows=100000, columns=4):
+    args = example_args(rows, columns)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        workbook = os.path.join(directory, 'data.xlsx')
+        RoboPandas.create_dataframe(*args[:(columns + 1) + columns * 10000]).to_excel(workbook, index=False)
+        RoboPandas.set_excel_cache()
+        RoboPandas.read_excel(workbook, 0, noreplace='*')
+        for orient in ORIENTATIONS:
+            before, expected = timed(lambda: through_dataframe(RoboPandas.create_dataframe(*args), 'column 0', orient))
+            after, result = timed(lambda: RoboPandas.create_dataframe(*args, set_index='column 0', to_dict=orient))
+            assert result == expected
+            results.append({'benchmark': 'to_dict', 'keyword': 'create_dataframe', 'orient': orient, 'rows': rows,
+                            'dataframe_s': before, 'rows_s': after, 'speedup': before / after})
+            read = lambda **options: RoboPandas.read_excel(workbook, 0, noreplace='*', **options)
+            before, expected = timed(lambda: through_dataframe(read(), 'column 0', orient))
+            after, result = timed(lambda: read(set_index='column 0', to_dict=orient))
+            assert result == expected
+            results.append({'benchmark': 'to_dict', 'keyword': 'read_excel', 'orient': orient, 'rows': 10000,
+                            'dataframe_s': before, 'rows_s': after, 'speedup': before / after})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    options = parser.parse_args()
+    print(f"{'keyword':<17} {'orient':<8} {'rows':>7} {'dataframe ms':>13} {'rows ms':>9} {'speedup':>8}")
+    for result in run(options.rows):
+        print(f"{result['keyword']:<17} {result['orient']:<8} {result['rows']:>7} {result['dataframe_s'] * 1000:>13.1f} "
+              f"{result['rows_s'] * 1000:>9.1f} {result['speedup']:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Compare the memory of dataframes created with object columns and with typed=True.
+
+Reports the memory of the dataframe (DataFrame.memory_usage with deep=True), the peak memory traced
+while creating it, which includes the intermediate arrays, and the time it took without tracing.
+Run from the repository root::
+
+    python benchmarks/typed_storage.py --rows 100000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import RoboPandas
+
+COUNTRIES = ('Netherlands', 'Belgium', 'Germany', 'France', 'United Kingdom of Great Britain and Northern Ireland')
+STATUSES = ('active', 'inactive', 'pending', 'blocked')
+
+
+def example_table(rows, columns=20):
+    # A wide Examples: like table: ids, numbers, a few repeated codes and some free text
+    headers = [f'column {col}' for col in range(columns)]
+    kinds = ('id', 'number', 'country', 'status', 'text')
+    cell = {
+        'id': lambda row, col: f'id-{row:08d}',
+        'number': lambda row, col: str(row * col % 100000),
+        'country': lambda row, col: COUNTRIES[(row + col) % len(COUNTRIES)],
+        'status': lambda row, col: STATUSES[row % len(STATUSES)],
+        'text': lambda row, col: f'free text {row} in column {col}',
+    }
+    data = [cell[kinds[col % len(kinds)]](row, col) for row in range(rows) for col in range(columns)]
+    return headers + ['--'] + data
+
+
+def measure(args, **options):
+    # Timed without tracing, tracemalloc slows down creating the many small objects
+    start = time.perf_counter()
+    df = RoboPandas.create_dataframe(*args, **options)
+    seconds = time.perf_counter() - start
+    frame = df.memory_usage(deep=True).sum()
+    del df
+    tracemalloc.start()
+    RoboPandas.create_dataframe(*args, **options)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': seconds, 'peak_mb': peak / 2 ** 20, 'frame_mb': frame / 2 ** 20}
+
+
+def run(rows=100000, columns=20):
+    args = example_table(rows, columns)
+    results = []
+    for mode, options in (('object', {}), ('typed', {'typed': True})):
+        results.append(dict(measure(args, **options), benchmark='typed_storage', mode=mode,
+                            rows=rows, columns=columns))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--columns', type=int, default=20)
+    options = parser.parse_args()
+    for result in run(options.rows, options.columns):
+        print(f"{result['mode']:<7} frame {result['frame_mb']:>8.1f} MB  peak {result['peak_mb']:>8.1f} MB  "
+              f"{result['seconds']:>6.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -34,5 +34,5 @@ setup(
     project_urls={
         "Examples": "https://github.com/worldline/RobotFramework-Examples",
     },    
-    install_requires=['robotframework', 'pandas', 'sqlalchemy', 'docutils']
+    install_requires=['robotframework>=4.0,<6.1', 'pandas', 'sqlalchemy', 'docutils']
 )